@@ -0,0 +1,35 @@
+import os
+from functools import lru_cache
+
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+SERIE_FILE = "data/serie_despesas_diarias_deputados.parquet"
+
+# Row groups pequenos: cada deputado ocupa poucos row groups e o filtro pula o resto pelas estatísticas
+ROW_GROUP_SIZE = 16_384
+
+
+def gravar_ordenado(table, path=SERIE_FILE, row_group_size=ROW_GROUP_SIZE):
+    # Ordenação estável: dentro de cada deputado a ordem por data e tipo é mantida
+    table = table.take(pc.sort_indices(table, sort_keys=[("deputado_id", "ascending")]))
+    pq.write_table(table, path, row_group_size=row_group_size, write_statistics=True)
+    return table
+
+
+def _versao(path):
+    # A data de modificação entra na chave do cache para invalidá-lo quando o pipeline regrava o arquivo
+    return os.stat(path).st_mtime_ns
+
+
+@lru_cache(maxsize=32)
+def _carregar_deputado(path, versao, deputado_id):
+    dataset = ds.dataset(path, format="parquet")
+    # O filtro é empurrado para o leitor, que descarta row groups cujo min/max não contém o deputado
+    table = dataset.to_table(filter=ds.field("deputado_id") == deputado_id)
+    return table.to_pandas()
+
+
+def carregar_despesas_deputado(deputado_id, path=SERIE_FILE):
+    return _carregar_deputado(path, _versao(path), int(deputado_id))
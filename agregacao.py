@@ -0,0 +1,216 @@
+import os
+import shutil
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from acesso_despesas import gravar_ordenado
+
+CHAVES = ["dataDocumento", "deputado_id", "tipoDespesa"]
+VALORES = ["valorDocumento", "valorLiquido"]
+
+# Acima desse intervalo de valores a compactação de chaves usa np.unique em vez de uma tabela densa
+MAX_TABELA_COMPACTACAO = 1 << 24
+
+# Na agregação paralela, cada processo recebe mais de um período para compensar diferenças de velocidade
+PARTICOES_POR_PROCESSO = 2
+
+# O pipeline roda etapas em threads: fork copiaria locks possivelmente presos em outras threads
+CONTEXTO_PROCESSOS = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+# Partições trocadas entre processos ficam em memória compartilhada (tmpfs) quando disponível
+DIR_PARTICOES = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+# Mesmo schema gerado pela versão em pandas (datas python viram date32 no Parquet)
+SCHEMA_SAIDA = pa.schema([
+    ("dataDocumento", pa.date32()),
+    ("deputado_id", pa.int64()),
+    ("tipoDespesa", pa.string()),
+    ("valorDocumento", pa.float64()),
+    ("valorLiquido", pa.float64()),
+])
+
+
+def _coluna(df, nome, tipo):
+    # Converte uma coluna por vez, direto para o tipo compacto, sem materializar uma tabela intermediária
+    if isinstance(df, pa.Table):
+        coluna = df[nome]
+        if tipo is None or coluna.type == tipo:
+            return coluna
+        if pa.types.is_dictionary(tipo):
+            return pc.dictionary_encode(coluna)
+        return pc.cast(coluna, tipo)
+    return pa.array(df[nome], type=tipo, from_pandas=True)
+
+
+def _para_date32(coluna):
+    if pa.types.is_date32(coluna.type):
+        return coluna
+    if pa.types.is_timestamp(coluna.type) or pa.types.is_date(coluna.type) or pa.types.is_null(coluna.type):
+        return pc.cast(coluna, pa.date32())
+    # A API retorna "AAAA-MM-DD" ou "AAAA-MM-DDTHH:MM:SS": basta cortar a parte da data
+    return pc.cast(pc.utf8_slice_codeunits(coluna, 0, 10), pa.date32())
+
+
+def normalizar(df):
+    # Tipos compactos: data como date32, tipo de despesa como dicionário e ids em int32
+    table = pa.table({
+        "dataDocumento": _para_date32(_coluna(df, "dataDocumento", None)),
+        "deputado_id": _coluna(df, "deputado_id", pa.int32()),
+        "tipoDespesa": _coluna(df, "tipoDespesa", pa.dictionary(pa.int32(), pa.string())),
+        "valorDocumento": _coluna(df, "valorDocumento", pa.float64()),
+        "valorLiquido": _coluna(df, "valorLiquido", pa.float64()),
+    })
+
+    # Assim como o groupby do pandas, linhas com chave nula são descartadas
+    valido = pc.and_(
+        pc.and_(pc.is_valid(table["dataDocumento"]), pc.is_valid(table["deputado_id"])),
+        pc.is_valid(table["tipoDespesa"]),
+    )
+    return table.filter(valido)
+
+
+def _compactar(valores):
+    # Mapeia inteiros para códigos 0..k-1 na mesma ordem, sem ordenar as n linhas
+    minimo = valores.min()
+    span = valores.max() - minimo + 1
+    if span > MAX_TABELA_COMPACTACAO:
+        unicos, codigos = np.unique(valores, return_inverse=True)
+        return codigos, unicos
+
+    presente = np.zeros(span, dtype=bool)
+    presente[valores - minimo] = True
+    rank = np.cumsum(presente) - 1
+    return rank[valores - minimo], np.flatnonzero(presente) + minimo
+
+
+def _somar_por_chave(chave, n_chaves, valores):
+    # Espaço de chaves pequeno: soma densa com bincount em O(n), já na ordem das chaves
+    if n_chaves <= max(4 * len(chave), 1 << 22):
+        chaves = np.flatnonzero(np.bincount(chave, minlength=n_chaves))
+        return chaves, [np.bincount(chave, weights=v, minlength=n_chaves)[chaves] for v in valores]
+
+    # Caso contrário, ordena uma única vez e soma cada bloco de chaves iguais
+    ordem = np.argsort(chave, kind="stable")
+    chave = chave[ordem]
+    inicios = np.flatnonzero(np.r_[True, chave[1:] != chave[:-1]])
+    return chave[inicios], [np.add.reduceat(v[ordem], inicios) for v in valores]
+
+
+def agregar_despesas_diarias(df):
+    table = normalizar(df).unify_dictionaries().combine_chunks()
+    if table.num_rows == 0:
+        return SCHEMA_SAIDA.empty_table()
+
+    cod_dias, dias = _compactar(pc.cast(table["dataDocumento"], pa.int32()).to_numpy())
+    cod_ids, ids = _compactar(table["deputado_id"].to_numpy())
+
+    # Ordena o dicionário (poucos valores) para que o código de cada tipo siga a ordem alfabética
+    tipos = table["tipoDespesa"].chunk(0)
+    ordem = pc.sort_indices(tipos.dictionary).to_numpy()
+    rank = np.empty(len(ordem), dtype=np.int64)
+    rank[ordem] = np.arange(len(ordem))
+    cod_tipos = rank[tipos.indices.to_numpy()]
+
+    # As três chaves viram um único int64 que preserva a ordem (data, deputado, tipo)
+    n_ids, n_tipos = len(ids), len(ordem)
+    chave = (cod_dias.astype(np.int64) * n_ids + cod_ids) * n_tipos + cod_tipos
+
+    # Valores nulos somam 0, como no pandas
+    valores = [pc.fill_null(table[col], 0.0).to_numpy() for col in VALORES]
+    chaves, somas = _somar_por_chave(chave, len(dias) * n_ids * n_tipos, valores)
+
+    resto, cod_tipos = np.divmod(chaves, n_tipos)
+    cod_dias, cod_ids = np.divmod(resto, n_ids)
+
+    colunas = [
+        pa.array(dias[cod_dias].astype(np.int32)).cast(pa.date32()),
+        pa.array(ids[cod_ids], type=pa.int64()),
+        tipos.dictionary.take(pa.array(ordem)).take(pa.array(cod_tipos)).cast(pa.string()),
+        *[pa.array(soma, type=pa.float64()) for soma in somas],
+    ]
+    # O resultado já sai ordenado pelas chaves, como no groupby do pandas
+    return pa.table(colunas, schema=SCHEMA_SAIDA)
+
+
+def _gravar_ipc(table, path):
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _ler_ipc(path):
+    # Memory map: as colunas apontam direto para o arquivo, sem cópia nem pickle entre processos
+    return pa.ipc.open_file(pa.memory_map(path)).read_all()
+
+
+def _dias(table):
+    return pc.cast(table["dataDocumento"], pa.int32()).to_numpy()
+
+
+def particionar_periodos(dias, n):
+    # Intervalos de dias consecutivos com aproximadamente o mesmo número de linhas.
+    # Devolve, para cada linha, o índice do seu período, e a quantidade de períodos
+    minimo = dias.min()
+    acumulado = np.cumsum(np.bincount(dias - minimo))
+    cortes = np.searchsorted(acumulado, np.arange(1, n) * len(dias) / n) + minimo
+    limites = np.unique(np.r_[minimo, cortes, dias.max() + 1])
+    periodo = (np.searchsorted(limites, dias, side="right") - 1).astype(np.uint16)
+    return periodo, len(limites) - 1
+
+
+def _agregar_particao(entrada, indices, inicio, fim, saida):
+    # Cada processo recebe um trecho contíguo dos índices já agrupados por período e lê só essas linhas
+    table = _ler_ipc(entrada)
+    linhas = np.load(indices, mmap_mode="r")[inicio:fim]
+    _gravar_ipc(agregar_despesas_diarias(table.take(pa.array(linhas))), saida)
+    return saida
+
+
+def agregar_despesas_paralelo(df, processos=None):
+    processos = processos or os.cpu_count()
+    table = normalizar(df).unify_dictionaries().combine_chunks()
+    if processos <= 1 or table.num_rows == 0:
+        return agregar_despesas_diarias(table)
+
+    tmp = tempfile.mkdtemp(prefix="agregacao_", dir=DIR_PARTICOES)
+    try:
+        entrada = os.path.join(tmp, "despesas.arrow")
+        _gravar_ipc(table, entrada)
+
+        # Um único agrupamento das linhas por período (radix sort em uint16, O(n)); cada período
+        # vira um intervalo [inicio, fim) do vetor de índices, compartilhado por memory map
+        periodo, n_periodos = particionar_periodos(_dias(table), processos * PARTICOES_POR_PROCESSO)
+        indices = os.path.join(tmp, "indices.npy")
+        np.save(indices, np.argsort(periodo, kind="stable"))
+        limites = np.r_[0, np.cumsum(np.bincount(periodo, minlength=n_periodos))].tolist()
+        del table, periodo
+
+        contexto = multiprocessing.get_context(CONTEXTO_PROCESSOS)
+        if CONTEXTO_PROCESSOS == "forkserver":
+            # O servidor importa pyarrow/numpy uma vez; cada processo do pool nasce com eles carregados
+            contexto.set_forkserver_preload(["agregacao"])
+        with ProcessPoolExecutor(max_workers=processos, mp_context=contexto) as executor:
+            saidas = list(executor.map(
+                _agregar_particao,
+                [entrada] * n_periodos,
+                [indices] * n_periodos,
+                limites[:-1],
+                limites[1:],
+                [os.path.join(tmp, f"soma-{i}.arrow") for i in range(n_periodos)],
+            ))
+
+        # Um dia só aparece em um período e cada parcial já sai ordenada por (data, deputado, tipo):
+        # concatenar na ordem dos períodos reproduz a saída da agregação em um processo
+        return pa.concat_tables([_ler_ipc(saida) for saida in saidas]).combine_chunks()
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def gravar_serie_diaria(df, path="data/serie_despesas_diarias_deputados.parquet", processos=1):
+    table = agregar_despesas_paralelo(df, processos) if processos > 1 else agregar_despesas_diarias(df)
+    # Gravada ordenada por deputado, com estatísticas por row group, para leitura seletiva no dashboard
+    return gravar_ordenado(table, path)
@@ -0,0 +1,88 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+SERIE_FILE = "data/serie_despesas_diarias_deputados.parquet"
+ANALYTICS_DIR = "data/analytics"
+
+CHAVES = ["deputado_id", "tipoDespesa"]
+COLUNAS = CHAVES + ["valorDocumento", "valorLiquido"]
+
+TABELAS = ["despesas_deputado_tipo", "despesas_deputado", "despesas_tipo", "maiores_gastos"]
+
+
+def caminho_tabela(nome, analytics_dir=ANALYTICS_DIR):
+    return os.path.join(analytics_dir, f"{nome}.parquet")
+
+
+def _agregar(table, colunas):
+    # colunas: {coluna_de_saida: (coluna_de_entrada, agregação)}
+    agregado = table.group_by(CHAVES).aggregate([origem for origem in colunas.values()])
+    nomes = {f"{col}_{agg}": saida for saida, (col, agg) in colunas.items()}
+    return agregado.rename_columns([nomes.get(col, col) for col in agregado.column_names])
+
+
+def escanear(path=SERIE_FILE, batch_size=1 << 20):
+    # Uma única leitura em lotes: cada lote vira somas parciais por deputado/tipo, combinadas no final
+    parciais = []
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size, columns=COLUNAS):
+        parciais.append(_agregar(pa.Table.from_batches([batch]), {
+            "valorDocumento": ("valorDocumento", "sum"),
+            "valorLiquido": ("valorLiquido", "sum"),
+            "registros": ("deputado_id", "count"),
+        }))
+
+    if not parciais:
+        return pd.DataFrame(columns=COLUNAS + ["registros"])
+
+    base = _agregar(pa.concat_tables(parciais), {
+        "valorDocumento": ("valorDocumento", "sum"),
+        "valorLiquido": ("valorLiquido", "sum"),
+        "registros": ("registros", "sum"),
+    })
+    return base.to_pandas().sort_values(CHAVES, ignore_index=True)
+
+
+def calcular_tabelas(base):
+    # Todas as métricas saem da tabela deputado x tipo, que é pequena, sem reler a série
+    por_deputado = base.groupby("deputado_id")[["valorDocumento", "valorLiquido", "registros"]].sum()
+    por_deputado["media"] = por_deputado["valorLiquido"] / por_deputado["registros"]
+
+    # Tipo mais frequente por deputado; empates resolvidos pela ordem alfabética, como no mode() do pandas
+    mais_frequente = (
+        base.sort_values(["deputado_id", "registros", "tipoDespesa"], ascending=[True, False, True])
+        .drop_duplicates("deputado_id")
+        .set_index("deputado_id")
+    )
+    por_deputado["tipo_mais_frequente"] = mais_frequente["tipoDespesa"]
+    por_deputado["frequencia_tipo"] = mais_frequente["registros"]
+
+    por_tipo = base.groupby("tipoDespesa")[["valorDocumento", "valorLiquido", "registros"]].sum()
+    por_tipo["media"] = por_tipo["valorLiquido"] / por_tipo["registros"]
+    por_tipo["proporcao"] = por_tipo["valorLiquido"] / por_tipo["valorLiquido"].sum()
+
+    top_deputados = por_deputado["valorLiquido"].nlargest(3).index
+    maiores_gastos = base[base["deputado_id"].isin(top_deputados)]
+
+    return {
+        "despesas_deputado_tipo": base,
+        "despesas_deputado": por_deputado.reset_index(),
+        "despesas_tipo": por_tipo.sort_values("valorLiquido", ascending=False).reset_index(),
+        "maiores_gastos": maiores_gastos.reset_index(drop=True),
+    }
+
+
+def gerar_tabelas(path=SERIE_FILE, analytics_dir=ANALYTICS_DIR):
+    tabelas = calcular_tabelas(escanear(path))
+
+    os.makedirs(analytics_dir, exist_ok=True)
+    for nome, df in tabelas.items():
+        df.to_parquet(caminho_tabela(nome, analytics_dir), index=False)
+
+    return tabelas
+
+
+def carregar_tabela(nome, analytics_dir=ANALYTICS_DIR):
+    return pd.read_parquet(caminho_tabela(nome, analytics_dir))
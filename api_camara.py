@@ -0,0 +1,170 @@
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metricas import metricas, endpoint
+
+BASE_URL = "https://dadosabertos.camara.leg.br/api/v2"
+
+# Status que indicam limite de requisições ou falha temporária do servidor
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class Estatisticas:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.inicio = time.perf_counter()
+        self.requisicoes = 0
+        self.linhas = 0
+        self.retries = 0
+        self.erros = 0
+
+    def registrar(self, requisicoes=0, linhas=0, retries=0, erros=0):
+        with self._lock:
+            self.requisicoes += requisicoes
+            self.linhas += linhas
+            self.retries += retries
+            self.erros += erros
+
+    def resumo(self):
+        duracao = max(time.perf_counter() - self.inicio, 1e-9)
+        return {
+            "duracao_s": round(duracao, 3),
+            "requisicoes": self.requisicoes,
+            "linhas": self.linhas,
+            "retries": self.retries,
+            "erros": self.erros,
+            "requisicoes_por_s": round(self.requisicoes / duracao, 2),
+            "linhas_por_s": round(self.linhas / duracao, 2),
+        }
+
+    def __str__(self):
+        r = self.resumo()
+        return (
+            f"{r['requisicoes']} requisições, {r['linhas']} linhas em {r['duracao_s']}s "
+            f"({r['requisicoes_por_s']} req/s, {r['linhas_por_s']} linhas/s, "
+            f"{r['retries']} retries, {r['erros']} erros)"
+        )
+
+
+def criar_sessao(max_workers=16):
+    # Uma única sessão com pool de conexões keep-alive compartilhada entre as threads
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"Accept": "application/json"})
+    return session
+
+
+def _tempo_espera(tentativa, backoff, retry_after=None):
+    if retry_after is not None:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    # Backoff exponencial com jitter para não sincronizar as threads
+    return backoff * 2 ** tentativa + random.uniform(0, backoff)
+
+
+def requisitar(session, url, params=None, headers=None, max_retries=5, backoff=0.5, timeout=30, stats=None):
+    rota = endpoint(url)
+    for tentativa in range(max_retries + 1):
+        retry_after = None
+        inicio = time.perf_counter()
+        try:
+            response = session.get(url, params=params, headers=headers, timeout=timeout)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            metricas.incrementar("http_respostas_total", endpoint=rota, status=type(e).__name__)
+            if tentativa == max_retries:
+                raise
+        else:
+            metricas.observar("http_latencia_segundos", time.perf_counter() - inicio, endpoint=rota)
+            metricas.incrementar("http_respostas_total", endpoint=rota, status=response.status_code)
+            if stats is not None:
+                stats.registrar(requisicoes=1)
+            if response.status_code not in RETRY_STATUS or tentativa == max_retries:
+                response.raise_for_status()
+                return response
+            retry_after = response.headers.get("Retry-After")
+
+        metricas.incrementar("http_retries_total", endpoint=rota)
+        if stats is not None:
+            stats.registrar(retries=1)
+        time.sleep(_tempo_espera(tentativa, backoff, retry_after))
+
+
+def get_json(session, url, params=None, cache=None, **kwargs):
+    if cache is None:
+        return requisitar(session, url, params, **kwargs).json()
+
+    def fetch(url, params, headers):
+        return requisitar(session, url, params, headers=headers, **kwargs)
+
+    return cache.get_json(url, params, fetch)
+
+
+def proximo_link(data):
+    for link in data.get("links", []):
+        if link.get("rel") == "next":
+            return link.get("href")
+    return None
+
+
+def get_paginado(session, url, params=None, **kwargs):
+    # Segue os links "next" da API até a última página
+    while url:
+        data = get_json(session, url, params=params, **kwargs)
+        yield data["dados"]
+        url = proximo_link(data)
+        # O link "next" já contém todos os parâmetros da consulta
+        params = None
+
+
+def coletar_despesas_deputado(session, id, base_url=BASE_URL, params=None, stats=None, escritor=None, **kwargs):
+    url = f"{base_url}/deputados/{id}/despesas"
+    linhas = []
+
+    for pagina in get_paginado(session, url, params=params, stats=stats, **kwargs):
+        if escritor is not None:
+            # Páginas vão direto para o Parquet, sem acumular as linhas em memória
+            escritor.adicionar(id, pagina)
+        else:
+            for item in pagina:
+                item["deputado_id"] = id
+            linhas.extend(pagina)
+        if stats is not None:
+            stats.registrar(linhas=len(pagina))
+
+    return linhas
+
+
+def coletar_despesas(ids, base_url=BASE_URL, max_workers=16, itens=100, params=None, session=None, stats=None, cache=None, escritor=None, **kwargs):
+    session = session or criar_sessao(max_workers)
+    stats = stats or Estatisticas()
+    params = {"itens": itens, **(params or {})}
+    all_data = []
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(coletar_despesas_deputado, session, id, base_url, params, stats, escritor, cache=cache, **kwargs)
+            for id in ids
+        ]
+
+        # Mantém a ordem dos ids de entrada no resultado
+        for id, future in zip(ids, futures):
+            try:
+                all_data.extend(future.result())
+            except Exception as e:
+                stats.registrar(erros=1)
+                print(f"Erro ao processar ID {id}: {e}")
+
+    print(f"Despesas: {stats}")
+    if cache is not None:
+        print(f"Despesas: {cache}")
+
+    return all_data
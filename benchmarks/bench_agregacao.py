@@ -0,0 +1,54 @@
+import argparse
+import multiprocessing
+
+import pandas as pd
+
+from comum import medir
+from dados_sinteticos import gerar_despesas
+
+from agregacao import agregar_despesas_diarias
+
+
+def agregar_pandas(df):
+    # Implementação original de questao4a, usada como referência
+    df['dataDocumento'] = pd.to_datetime(df['dataDocumento'])
+
+    return df.groupby([df['dataDocumento'].dt.date, 'deputado_id', 'tipoDespesa']).agg({
+        'valorDocumento': 'sum',
+        'valorLiquido': 'sum'
+    }).reset_index()
+
+
+def agregar_arrow(df):
+    return agregar_despesas_diarias(df)
+
+
+def _executar(nome, n_linhas, fila):
+    # Cada implementação roda em um processo próprio para isolar a medição de memória
+    df = gerar_despesas(n_linhas)
+    func = {"pandas": agregar_pandas, "arrow": agregar_arrow}[nome]
+    resultado, duracao, memoria = medir(func, df)
+    fila.put((nome, duracao, memoria, len(resultado)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark da agregação diária de despesas (questao4a)")
+    parser.add_argument("--linhas", type=int, default=10_000_000)
+    args = parser.parse_args(argv)
+
+    fila = multiprocessing.Queue()
+    resultados = {}
+    for nome in ("pandas", "arrow"):
+        processo = multiprocessing.Process(target=_executar, args=(nome, args.linhas, fila))
+        processo.start()
+        nome, duracao, memoria, linhas_saida = fila.get()
+        processo.join()
+        resultados[nome] = (duracao, memoria)
+        print(f"{nome:>6}: {duracao:8.2f}s | pico de memória +{memoria / 2**20:8.1f} MiB | {linhas_saida} linhas agregadas")
+
+    (t_pandas, m_pandas), (t_arrow, m_arrow) = resultados["pandas"], resultados["arrow"]
+    print(f"speedup: {t_pandas / t_arrow:.2f}x | memória: {m_arrow / max(m_pandas, 1):.0%} da versão em pandas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import os
+import argparse
+
+import numpy as np
+
+from comum import medir
+from dados_sinteticos import LEGISLATURA, gerar_despesas
+
+from agregacao import CHAVES, VALORES, agregar_despesas_diarias, agregar_despesas_paralelo, normalizar
+
+
+def iguais(a, b):
+    # As chaves devem ser idênticas; as somas podem diferir no último bit pela ordem de soma em cada partição
+    return a.select(CHAVES).equals(b.select(CHAVES)) and all(
+        np.allclose(a[coluna].to_numpy(), b[coluna].to_numpy(), rtol=1e-12, atol=1e-9) for coluna in VALORES
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Curva de escalabilidade da agregação diária particionada por período")
+    parser.add_argument("--linhas", type=int, default=4 * LEGISLATURA["despesas"], help="Padrão: quatro legislaturas")
+    parser.add_argument("--anos", type=int, default=16)
+    parser.add_argument("--processos", help="Números de processos separados por vírgula (padrão: 1, 2, 4... até os núcleos)")
+    args = parser.parse_args(argv)
+
+    if args.processos:
+        processos = [int(n) for n in args.processos.split(",")]
+    else:
+        processos = [1]
+        while processos[-1] * 2 <= os.cpu_count():
+            processos.append(processos[-1] * 2)
+        if processos[-1] != os.cpu_count():
+            processos.append(os.cpu_count())
+
+    df = gerar_despesas(args.linhas, anos=args.anos)
+    print(f"{args.linhas} despesas, {args.anos} anos, {df['deputado_id'].nunique()} deputados, {os.cpu_count()} núcleos\n")
+    # Entrada já em Arrow com os tipos compactos, como lida de data/despesas_deputados.parquet
+    df = normalizar(df)
+
+    # Aquece o forkserver (que importa pyarrow uma única vez por execução) fora da medição
+    agregar_despesas_paralelo(df.slice(0, 1000), 2)
+
+    # Referência em um processo: agregar_despesas_paralelo com 1 processo usa o mesmo caminho
+    referencia, base, _ = medir(agregar_despesas_diarias, df)
+    print(f"{'Processos':>9} | {'Tempo (s)':>9} | {'Speedup':>7} | {'Eficiência':>10} | {'RSS (MB)':>8}")
+    print("-" * 56)
+
+    for n in processos:
+        resultado, duracao, memoria = medir(agregar_despesas_paralelo, df, n)
+        if not iguais(resultado, referencia):
+            raise AssertionError(f"Resultado com {n} processos difere da agregação serial")
+        speedup = base / duracao
+        print(f"{n:>9} | {duracao:9.3f} | {speedup:7.2f} | {speedup / n:10.0%} | {memoria / 2**20:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from metricas import MonitorRSS, rss_bytes
+
+
+def medir(func, *args, intervalo=0.005, **kwargs):
+    # Amostra o RSS em uma thread enquanto a função roda para obter o pico acima do RSS inicial
+    inicial = rss_bytes()
+    with MonitorRSS(intervalo) as rss:
+        inicio = time.perf_counter()
+        resultado = func(*args, **kwargs)
+        duracao = time.perf_counter() - inicio
+
+    return resultado, duracao, rss.pico - inicial
@@ -0,0 +1,154 @@
+import os
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from comum import RAIZ
+
+# Ordem de grandeza de uma legislatura completa (4 anos); a escala multiplica todas as contagens
+LEGISLATURA = {"deputados": 513, "despesas": 800_000, "proposicoes": 20_000}
+INICIO_LEGISLATURA = "2023-02-01"
+
+# Tipos mais comuns primeiro, com pesos aproximados da frequência real
+TIPOS_DESPESA = [
+    "MANUTENÇÃO DE ESCRITÓRIO DE APOIO À ATIVIDADE PARLAMENTAR",
+    "COMBUSTÍVEIS E LUBRIFICANTES.",
+    "PASSAGEM AÉREA - SIGEPA",
+    "DIVULGAÇÃO DA ATIVIDADE PARLAMENTAR.",
+    "TELEFONIA",
+    "SERVIÇOS POSTAIS",
+    "HOSPEDAGEM ,EXCETO DO PARLAMENTAR NO DISTRITO FEDERAL.",
+    "FORNECIMENTO DE ALIMENTAÇÃO DO PARLAMENTAR",
+    "LOCAÇÃO OU FRETAMENTO DE VEÍCULOS AUTOMOTORES",
+    "CONSULTORIAS, PESQUISAS E TRABALHOS TÉCNICOS.",
+]
+PESOS_TIPOS = np.array([18, 30, 14, 8, 6, 4, 5, 9, 4, 2], dtype=float)
+
+PARTIDOS = ["PL", "PT", "UNIÃO", "PP", "MDB", "PSD", "REPUBLICANOS", "PDT", "PSB", "PSDB", "PSOL", "PODE"]
+UFS = [
+    "AC", "AL", "AM", "AP", "BA", "CE", "DF", "ES", "GO", "MA", "MG", "MS", "MT", "PA",
+    "PB", "PE", "PI", "PR", "RJ", "RN", "RO", "RR", "RS", "SC", "SE", "SP", "TO",
+]
+
+TEMAS = ["40", "46", "62", "34", "48", "52"]
+ASSUNTOS = [
+    "licitações e contratos administrativos", "proteção de dados pessoais", "segurança pública",
+    "educação básica", "saúde da mulher", "energia renovável", "transporte rodoviário",
+    "direitos das pessoas com deficiência", "tributação de pequenas empresas", "meio ambiente",
+]
+MODELOS_EMENTA = [
+    "Altera a Lei nº {lei}, de {ano_lei}, para dispor sobre {assunto}.",
+    "Dispõe sobre {assunto} e dá outras providências.",
+    "Institui o Programa Nacional de {assunto} no âmbito do Sistema Único.",
+    "Acrescenta o art. {artigo} à Lei nº {lei}, de {ano_lei}, que trata de {assunto}.",
+    "Estabelece normas gerais sobre {assunto} nos Estados e Municípios.",
+]
+
+
+def ids_deputados(n):
+    return np.arange(1, n + 1, dtype=np.int64) * 7 + 200_000
+
+
+def gerar_deputados(n_deputados=LEGISLATURA["deputados"], seed=0):
+    # Mesmas colunas de data/deputados.parquet
+    rng = np.random.default_rng(seed)
+    ids = ids_deputados(n_deputados)
+    base = "https://dadosabertos.camara.leg.br/api/v2"
+    return pd.DataFrame({
+        "id": ids,
+        "uri": [f"{base}/deputados/{id}" for id in ids],
+        "nome": [f"Deputado {id}" for id in ids],
+        "siglaPartido": np.array(PARTIDOS, dtype=object)[rng.integers(0, len(PARTIDOS), n_deputados)],
+        "uriPartido": f"{base}/partidos/0",
+        "siglaUf": np.array(UFS, dtype=object)[rng.integers(0, len(UFS), n_deputados)],
+        "idLegislatura": 57,
+        "urlFoto": [f"https://www.camara.leg.br/internet/deputado/bandep/{id}.jpg" for id in ids],
+        "email": [f"dep.{id}@camara.leg.br" for id in ids],
+    })
+
+
+def gerar_despesas(n_linhas, n_deputados=LEGISLATURA["deputados"], anos=4, seed=0):
+    # Mesmo formato das linhas de /deputados/{id}/despesas (datas como string do JSON da API);
+    # a atividade varia por deputado e os valores seguem uma distribuição assimétrica
+    rng = np.random.default_rng(seed)
+    datas = pd.date_range(INICIO_LEGISLATURA, periods=365 * anos)
+    tipos = np.array(TIPOS_DESPESA, dtype=object)
+
+    atividade = rng.gamma(2.0, 1.0, n_deputados)
+    deputado = rng.choice(n_deputados, n_linhas, p=atividade / atividade.sum())
+    dia = rng.integers(0, len(datas), n_linhas)
+    tipo = rng.choice(len(tipos), n_linhas, p=PESOS_TIPOS / PESOS_TIPOS.sum())
+    valor = np.round(rng.gamma(2.0, 400.0, n_linhas), 2)
+    glosa = np.where(rng.random(n_linhas) < 0.05, np.round(valor * rng.uniform(0, 0.3, n_linhas), 2), 0.0)
+
+    return pd.DataFrame({
+        "ano": datas.year.to_numpy()[dia],
+        "mes": datas.month.to_numpy()[dia],
+        "tipoDespesa": tipos[tipo],
+        "codDocumento": rng.integers(7_000_000, 8_000_000, n_linhas),
+        "dataDocumento": datas.strftime("%Y-%m-%dT00:00:00").to_numpy(dtype=object)[dia],
+        "valorDocumento": valor,
+        "nomeFornecedor": np.char.add("FORNECEDOR ", rng.integers(0, 5_000, n_linhas).astype(str)).astype(object),
+        "valorLiquido": np.round(valor - glosa, 2),
+        "valorGlosa": glosa,
+        "deputado_id": ids_deputados(n_deputados)[deputado],
+    })
+
+
+def gerar_proposicoes(n_proposicoes=LEGISLATURA["proposicoes"], anos=4, seed=0):
+    # As ementas vêm de poucos modelos, como na API: boa parte delas são quase duplicadas
+    rng = np.random.default_rng(seed)
+    datas = pd.date_range(INICIO_LEGISLATURA, periods=365 * anos)
+    ids = rng.choice(np.arange(2_000_000, 2_000_000 + 10 * n_proposicoes), n_proposicoes, replace=False)
+    modelos = rng.integers(0, len(MODELOS_EMENTA), n_proposicoes)
+    assuntos = rng.integers(0, len(ASSUNTOS), n_proposicoes)
+    dias = rng.integers(0, len(datas), n_proposicoes)
+
+    ementas = [
+        MODELOS_EMENTA[m].format(
+            lei=rng.integers(1_000, 15_000), ano_lei=rng.integers(1950, 2024),
+            artigo=rng.integers(2, 90), assunto=ASSUNTOS[a],
+        )
+        for m, a in zip(modelos, assuntos)
+    ]
+
+    return pd.DataFrame({
+        "id": ids,
+        "uri": [f"https://dadosabertos.camara.leg.br/api/v2/proposicoes/{id}" for id in ids],
+        "siglaTipo": np.where(modelos % 2 == 0, "PL", "PLP"),
+        "codTipo": np.where(modelos % 2 == 0, 139, 140),
+        "numero": rng.integers(1, 5_000, n_proposicoes),
+        "ano": datas.year.to_numpy()[dias],
+        "ementa": ementas,
+        # Colunas usadas apenas pelo stub para filtrar por tema e período
+        "codTema": np.array(TEMAS, dtype=object)[rng.integers(0, len(TEMAS), n_proposicoes)],
+        "dataApresentacao": datas.strftime("%Y-%m-%d").to_numpy(dtype=object)[dias],
+    })
+
+
+def gerar_legislatura(escala=1.0, seed=0):
+    n = {nome: max(int(total * escala), 1) for nome, total in LEGISLATURA.items()}
+    return {
+        "deputados": gerar_deputados(n["deputados"], seed),
+        "despesas": gerar_despesas(n["despesas"], n["deputados"], seed=seed),
+        "proposicoes": gerar_proposicoes(n["proposicoes"], seed=seed),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera dados sintéticos de uma legislatura em parquet")
+    parser.add_argument("--escala", type=float, default=1.0, help="Múltiplo de uma legislatura completa (1, 10, 100...)")
+    parser.add_argument("--saida", default=os.path.join(RAIZ, "data", ".cache", "sinteticos"))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.saida, exist_ok=True)
+    for nome, df in gerar_legislatura(args.escala, args.seed).items():
+        path = os.path.join(args.saida, f"{nome}.parquet")
+        df.to_parquet(path, index=False)
+        print(f"{path}: {len(df)} linhas")
+
+
+if __name__ == "__main__":
+    main()
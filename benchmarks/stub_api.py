@@ -0,0 +1,120 @@
+import json
+import time
+import random
+import threading
+from urllib.parse import urlparse, parse_qs, urlencode
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import numpy as np
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        stub = self.server.stub
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        partes = [parte for parte in url.path.split("/") if parte]
+
+        if stub.latencia:
+            time.sleep(stub.latencia)
+        if stub.taxa_erro and random.random() < stub.taxa_erro:
+            return self._responder(503, {"erro": "indisponível"}, {"Retry-After": "0"})
+
+        if partes == ["deputados"]:
+            return self._responder(200, {"dados": stub.deputados, "links": []})
+        if len(partes) == 3 and partes[0] == "deputados" and partes[2] == "despesas":
+            return self._paginar(url.path, params, stub.despesas_deputado(int(partes[1]), params))
+        if partes == ["proposicoes"]:
+            return self._paginar(url.path, params, stub.filtrar_proposicoes(params))
+        return self._responder(404, {"erro": "não encontrado"})
+
+    def _paginar(self, caminho, params, linhas):
+        itens = int(params.get("itens", ["15"])[0])
+        pagina = int(params.get("pagina", ["1"])[0])
+        ultima = max((len(linhas) + itens - 1) // itens, 1)
+
+        def link(rel, numero):
+            query = urlencode({**{k: v for k, v in params.items() if k != "pagina"}, "pagina": numero}, doseq=True)
+            return {"rel": rel, "href": f"{self.server.stub.base_url}{caminho}?{query}"}
+
+        links = [link("self", pagina), link("first", 1), link("last", ultima)]
+        if pagina < ultima:
+            links.append(link("next", pagina + 1))
+
+        dados = linhas[(pagina - 1) * itens:pagina * itens]
+        return self._responder(200, {"dados": dados.to_dict("records"), "links": links})
+
+    def _responder(self, status, corpo, headers=None):
+        conteudo = json.dumps(corpo, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(conteudo)))
+        for chave, valor in (headers or {}).items():
+            self.send_header(chave, valor)
+        self.end_headers()
+        self.wfile.write(conteudo)
+
+
+class ServidorStub:
+    # Imita os endpoints da API da Câmara usados pelo pipeline, servindo os dados sintéticos localmente
+    def __init__(self, deputados=None, despesas=None, proposicoes=None, latencia=0.0, taxa_erro=0.0):
+        self.deputados = deputados.to_dict("records") if deputados is not None else []
+        self.latencia = latencia
+        self.taxa_erro = taxa_erro
+        self.proposicoes = proposicoes
+
+        # Índice das linhas de cada deputado, para não filtrar o DataFrame inteiro a cada página
+        self.despesas = despesas
+        self.por_deputado = {}
+        if despesas is not None:
+            ordem = np.argsort(despesas["deputado_id"].to_numpy(), kind="stable")
+            ids, inicios = np.unique(despesas["deputado_id"].to_numpy()[ordem], return_index=True)
+            for id, linhas in zip(ids, np.split(ordem, inicios[1:])):
+                self.por_deputado[int(id)] = linhas
+
+        self.servidor = None
+        self.base_url = None
+
+    def despesas_deputado(self, deputado_id, params):
+        linhas = self.despesas.iloc[self.por_deputado.get(deputado_id, [])]
+        if "ano" in params:
+            linhas = linhas[linhas["ano"].isin([int(ano) for ano in params["ano"]])]
+        if "mes" in params:
+            linhas = linhas[linhas["mes"].isin([int(mes) for mes in params["mes"]])]
+        return linhas
+
+    def filtrar_proposicoes(self, params):
+        linhas = self.proposicoes
+        if "codTema" in params:
+            linhas = linhas[linhas["codTema"].isin(params["codTema"])]
+        if "dataInicio" in params:
+            linhas = linhas[linhas["dataApresentacao"] >= params["dataInicio"][0]]
+        if "dataFim" in params:
+            linhas = linhas[linhas["dataApresentacao"] <= params["dataFim"][0]]
+        if params.get("ordenarPor") == ["id"]:
+            linhas = linhas.sort_values("id")
+        return linhas.drop(columns=["codTema", "dataApresentacao"])
+
+    def iniciar(self):
+        self.servidor = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.servidor.daemon_threads = True
+        self.servidor.stub = self
+        self.base_url = f"http://127.0.0.1:{self.servidor.server_port}"
+        threading.Thread(target=self.servidor.serve_forever, daemon=True).start()
+        return self
+
+    def parar(self):
+        self.servidor.shutdown()
+        self.servidor.server_close()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.parar()
+        return False
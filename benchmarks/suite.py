@@ -0,0 +1,232 @@
+import os
+import sys
+import json
+import shutil
+import argparse
+import datetime
+import tempfile
+import statistics
+import subprocess
+
+from comum import RAIZ, medir
+from dados_sinteticos import gerar_legislatura
+from stub_api import ServidorStub
+
+from acesso_despesas import gravar_ordenado
+from agregacao import agregar_despesas_diarias
+from analytics import gerar_tabelas
+from api_camara import coletar_despesas
+from dados_dashboard import COLUNAS_SERIE, _chaves, _ler_snapshot, carregar_snapshot, fatia_ordenada
+from deduplicacao import agrupar
+from downsampling import reamostrar
+from executor_llm import ExecutorLLM, ModeloFalso
+from fluxo_despesas import coletar_e_agregar
+from snapshots import publicar
+from sumarizacao import sumarizar
+
+HISTORICO_FILE = os.path.join(RAIZ, "benchmarks", "resultados", "historico.jsonl")
+
+# Uma execução é regressão se ficar mais lenta que a mediana das últimas JANELA_BASE execuções
+# na mesma escala além do limite
+LIMITE_REGRESSAO = 0.20
+JANELA_BASE = 5
+
+
+def _gravar_serie(dados, tmp):
+    path = os.path.join(tmp, "serie.parquet")
+    gravar_ordenado(agregar_despesas_diarias(dados["despesas"]), path)
+    return path
+
+
+# Cada benchmark prepara o que não deve ser medido e devolve (rodar, finalizar);
+# rodar() retorna o número de itens processados, usado para calcular a vazão
+
+
+def bench_ingestao(dados, tmp):
+    # questao4: coleta concorrente e paginada das despesas, contra o stub local
+    servidor = ServidorStub(dados["deputados"], dados["despesas"]).iniciar()
+    ids = dados["deputados"]["id"].tolist()
+    return lambda: len(coletar_despesas(ids, base_url=servidor.base_url)), servidor.parar
+
+
+def bench_fluxo(dados, tmp):
+    # questao4_fluxo: coleta, conversão e agregação sobrepostas, contra o mesmo stub da ingestão
+    servidor = ServidorStub(dados["deputados"], dados["despesas"]).iniciar()
+    ids = dados["deputados"]["id"].tolist()
+    path = os.path.join(tmp, "serie.parquet")
+
+    def rodar():
+        coletar_e_agregar(ids, path, base_url=servidor.base_url)
+        return len(dados["despesas"])
+
+    return rodar, servidor.parar
+
+
+def bench_agregacao(dados, tmp):
+    # questao4a: agregação diária por deputado e tipo
+    return lambda: agregar_despesas_diarias(dados["despesas"]).num_rows, None
+
+
+def bench_analytics(dados, tmp):
+    # questao4b/questao4c: tabelas analíticas calculadas a partir da série diária
+    path = _gravar_serie(dados, tmp)
+    destino = os.path.join(tmp, "analytics")
+    return lambda: len(gerar_tabelas(path, destino)["despesas_deputado_tipo"]), None
+
+
+def bench_sumarizacao(dados, tmp):
+    # questao_5b: deduplicação, chunking e map-reduce com um modelo falso de latência fixa
+    proposicoes = dados["proposicoes"]
+    saida = os.path.join(tmp, "sumarizacao.json")
+
+    def rodar():
+        clusters = agrupar(proposicoes["id"].tolist(), proposicoes["ementa"].tolist())
+        executor = ExecutorLLM(ModeloFalso(latencia=0.05), max_workers=8, rpm=100_000, tpm=10**9)
+        sumarizar(None, [cluster["ementa"] for cluster in clusters], saida, executor=executor)
+        return len(proposicoes)
+
+    return rodar, None
+
+
+def _filtrar_deputados(destino, ids):
+    # Caminho do dashboard: snapshot mapeado em memória, busca binária do deputado e reamostragem do gráfico
+    for id in ids:
+        table = carregar_snapshot(destino, COLUNAS_SERIE)
+        reamostrar(fatia_ordenada(table, "deputado_id", id, destino))
+    return len(ids)
+
+
+def bench_dashboard(dados, tmp, n_deputados=50):
+    # Cache frio: cada repetição mapeia o snapshot e extrai a coluna de chaves de novo
+    destino = publicar(_gravar_serie(dados, tmp), os.path.join(tmp, "serie.arrow"))
+    ids = dados["deputados"]["id"].tolist()[:n_deputados]
+
+    def rodar():
+        _ler_snapshot.clear()
+        _chaves.clear()
+        return _filtrar_deputados(destino, ids)
+
+    return rodar, None
+
+
+def bench_dashboard_quente(dados, tmp, n_deputados=50):
+    # Cache quente: snapshot e chaves já em cache, como nos reruns de uma sessão
+    destino = publicar(_gravar_serie(dados, tmp), os.path.join(tmp, "serie.arrow"))
+    ids = dados["deputados"]["id"].tolist()[:n_deputados]
+    _filtrar_deputados(destino, ids)
+
+    return lambda: _filtrar_deputados(destino, ids), None
+
+
+BENCHMARKS = {
+    "ingestao": bench_ingestao,
+    "fluxo": bench_fluxo,
+    "agregacao": bench_agregacao,
+    "analytics": bench_analytics,
+    "sumarizacao": bench_sumarizacao,
+    "dashboard": bench_dashboard,
+    "dashboard_quente": bench_dashboard_quente,
+}
+
+
+def executar(nome, dados, repeticoes=3):
+    tmp = tempfile.mkdtemp(prefix=f"bench_{nome}_")
+    rodar, finalizar = BENCHMARKS[nome](dados, tmp)
+    try:
+        medicoes = [medir(rodar) for _ in range(repeticoes)]
+    finally:
+        if finalizar is not None:
+            finalizar()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    itens = medicoes[0][0]
+    duracao = statistics.median(duracao for _, duracao, _ in medicoes)
+    return {
+        "duracao_s": round(duracao, 4),
+        "itens": itens,
+        "itens_por_s": round(itens / max(duracao, 1e-9), 1),
+        "pico_rss_mb": round(max(memoria for _, _, memoria in medicoes) / 2**20, 1),
+    }
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def ler_historico(path=HISTORICO_FILE):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(linha) for linha in f if linha.strip()]
+
+
+def comparar(resultados, historico, escala, limite=LIMITE_REGRESSAO, janela=JANELA_BASE):
+    comparacao = {}
+    for nome, resultado in resultados.items():
+        anteriores = [
+            execucao["resultados"][nome]["duracao_s"]
+            for execucao in historico
+            if execucao["escala"] == escala and nome in execucao["resultados"]
+        ][-janela:]
+        if not anteriores:
+            comparacao[nome] = (None, None, False)
+            continue
+        base = statistics.median(anteriores)
+        variacao = resultado["duracao_s"] / base - 1
+        comparacao[nome] = (base, variacao, variacao > limite)
+    return comparacao
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Suíte de benchmarks do pipeline com dados sintéticos")
+    parser.add_argument("--escala", type=float, default=0.1, help="Múltiplo de uma legislatura completa (1, 10, 100...)")
+    parser.add_argument("--only", help="Benchmarks separados por vírgula")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--limite", type=float, default=LIMITE_REGRESSAO, help="Fração de piora tolerada")
+    parser.add_argument("--historico", default=HISTORICO_FILE)
+    parser.add_argument("--sem-historico", action="store_true", help="Não grava esta execução no histórico")
+    args = parser.parse_args(argv)
+
+    nomes = args.only.split(",") if args.only else list(BENCHMARKS)
+    desconhecidos = set(nomes) - set(BENCHMARKS)
+    if desconhecidos:
+        parser.error(f"benchmarks desconhecidos: {sorted(desconhecidos)}. Disponíveis: {list(BENCHMARKS)}")
+
+    dados = gerar_legislatura(args.escala)
+    print(f"Escala {args.escala}: " + ", ".join(f"{len(df)} {nome}" for nome, df in dados.items()))
+
+    resultados = {nome: executar(nome, dados, args.repeticoes) for nome in nomes}
+    comparacao = comparar(resultados, ler_historico(args.historico), args.escala, args.limite)
+
+    print(f"\n{'Benchmark':<16} | {'Tempo (s)':>9} | {'Itens/s':>11} | {'RSS (MB)':>8} | {'Base (s)':>8} | Variação")
+    print("-" * 80)
+    for nome, r in resultados.items():
+        base, variacao, regressao = comparacao[nome]
+        base_txt = f"{base:8.3f}" if base is not None else f"{'-':>8}"
+        variacao_txt = f"{variacao:+.1%}{' REGRESSÃO' if regressao else ''}" if variacao is not None else "-"
+        print(f"{nome:<16} | {r['duracao_s']:9.3f} | {r['itens_por_s']:11.1f} | {r['pico_rss_mb']:8.1f} | {base_txt} | {variacao_txt}")
+
+    if not args.sem_historico:
+        os.makedirs(os.path.dirname(args.historico), exist_ok=True)
+        with open(args.historico, "a", encoding="utf-8") as f:
+            f.write(json.dumps({
+                "data": datetime.datetime.now().isoformat(timespec="seconds"),
+                "commit": _commit(),
+                "escala": args.escala,
+                "repeticoes": args.repeticoes,
+                "resultados": resultados,
+            }, ensure_ascii=False) + "\n")
+
+    regressoes = [nome for nome, (_, _, regressao) in comparacao.items() if regressao]
+    if regressoes:
+        print(f"\nRegressões acima de {args.limite:.0%}: {', '.join(regressoes)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+import os
+import re
+import hashlib
+import unicodedata
+from functools import lru_cache
+
+import numpy as np
+
+INDICE_FILE = "data/proposicoes_deputados.busca.npz"
+
+# Parâmetros usuais do BM25
+K1 = 1.2
+B = 0.75
+
+STOPWORDS = set("""
+a ao aos as ate com como da das de dela dele deles do dos e ela elas ele eles em entre era essa esse esta
+este eu foi for ha isso isto ja la lhe mais mas me mesmo meu minha na nas nem no nos nossa nosso num numa
+o os ou para pela pelas pelo pelos por qual quando que quem se sem ser seu seus sob sobre sua suas tambem
+te tem ter um uma umas uns
+""".split())
+
+# Sufixos já sem acento, do mais longo para o mais curto; basta remover o primeiro que casar
+SUFIXOS = [
+    "amentos", "imentos", "amento", "imento", "adoras", "adores", "adora", "ador",
+    "acoes", "icoes", "acao", "icao", "mente", "idades", "idade", "ismos", "ismo",
+    "istas", "ista", "ancia", "encia", "ivas", "ivos", "iva", "ivo",
+    "oes", "aes", "ais", "eis", "res", "ns", "es", "s", "a", "o", "e",
+]
+
+TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def remover_acentos(texto):
+    # Após a decomposição NFKD os acentos viram caracteres combinantes, descartados no encode
+    return unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii")
+
+
+@lru_cache(maxsize=200_000)
+def radical(palavra):
+    for sufixo in SUFIXOS:
+        if palavra.endswith(sufixo) and len(palavra) - len(sufixo) >= 3:
+            return palavra[: -len(sufixo)]
+    return palavra
+
+
+def tokenizar(texto):
+    texto = remover_acentos((texto or "").lower())
+    return [radical(token) for token in TOKEN.findall(texto) if token not in STOPWORDS]
+
+
+def hash_texto(texto):
+    # 64 bits bastam para detectar ementas alteradas; 0 fica reservado para "desconhecido"
+    return int.from_bytes(hashlib.blake2b((texto or "").encode("utf-8"), digest_size=8).digest(), "little", signed=True) or 1
+
+
+class IndiceBM25:
+    # Índice invertido em formato CSR: os postings de cada termo são uma fatia contígua de docs/tfs
+    def __init__(self, termos=None, offsets=None, docs=None, tfs=None, tamanhos=None, ids=None, hashes=None):
+        self.termos = [str(termo) for termo in termos] if termos is not None else []
+        self.offsets = offsets if offsets is not None else np.zeros(1, dtype=np.int64)
+        self.docs = docs if docs is not None else np.zeros(0, dtype=np.int32)
+        self.tfs = tfs if tfs is not None else np.zeros(0, dtype=np.int32)
+        self.tamanhos = tamanhos if tamanhos is not None else np.zeros(0, dtype=np.int32)
+        self.ids = ids if ids is not None else np.zeros(0, dtype=np.int64)
+        # Hash da ementa de cada documento; índices gravados antes dele são reindexados por completo (hash 0)
+        self.hashes = hashes if hashes is not None else np.zeros(len(self.ids), dtype=np.int64)
+        self.vocabulario = {termo: i for i, termo in enumerate(self.termos)}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def adicionar(self, ids, textos):
+        # Só os documentos novos são tokenizados; seus postings são mesclados aos existentes
+        conhecidos = set(self.ids.tolist())
+        novos = [(int(id), texto) for id, texto in zip(ids, textos) if int(id) not in conhecidos]
+        if not novos:
+            return 0
+
+        base = len(self.ids)
+        termos_novos, docs_novos, tfs_novos, tamanhos_novos = [], [], [], []
+        for i, (_, texto) in enumerate(novos):
+            tokens = tokenizar(texto)
+            tamanhos_novos.append(len(tokens))
+            contagem = {}
+            for token in tokens:
+                contagem[token] = contagem.get(token, 0) + 1
+            for token, tf in contagem.items():
+                if token not in self.vocabulario:
+                    self.vocabulario[token] = len(self.termos)
+                    self.termos.append(token)
+                termos_novos.append(self.vocabulario[token])
+                docs_novos.append(base + i)
+                tfs_novos.append(tf)
+
+        # Volta os postings antigos para o formato (termo, doc, tf), concatena e reordena por termo
+        termos_antigos = np.repeat(np.arange(len(self.offsets) - 1), np.diff(self.offsets))
+        termos = np.concatenate([termos_antigos, np.asarray(termos_novos, dtype=np.int64)])
+        docs = np.concatenate([self.docs, np.asarray(docs_novos, dtype=np.int32)])
+        tfs = np.concatenate([self.tfs, np.asarray(tfs_novos, dtype=np.int32)])
+
+        ordem = np.argsort(termos, kind="stable")
+        self.docs, self.tfs = docs[ordem], tfs[ordem]
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(termos, minlength=len(self.termos)))])
+        self.tamanhos = np.concatenate([self.tamanhos, np.asarray(tamanhos_novos, dtype=np.int32)])
+        self.ids = np.concatenate([self.ids, np.asarray([id for id, _ in novos], dtype=np.int64)])
+        self.hashes = np.concatenate([self.hashes, np.asarray([hash_texto(texto) for _, texto in novos], dtype=np.int64)])
+
+        return len(novos)
+
+    def remover(self, ids):
+        remover = np.isin(self.ids, np.asarray(list(ids), dtype=np.int64))
+        if not remover.any():
+            return 0
+
+        # Descarta os postings dos documentos removidos e renumera os demais; a ordem por termo se mantém
+        manter = ~remover
+        nova_posicao = np.cumsum(manter) - 1
+        termos = np.repeat(np.arange(len(self.offsets) - 1), np.diff(self.offsets))
+        selecionados = manter[self.docs]
+        termos = termos[selecionados]
+        self.docs = nova_posicao[self.docs[selecionados]].astype(np.int32)
+        self.tfs = self.tfs[selecionados]
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(termos, minlength=len(self.termos)))])
+        self.tamanhos, self.ids, self.hashes = self.tamanhos[manter], self.ids[manter], self.hashes[manter]
+
+        return int(remover.sum())
+
+    def sincronizar(self, ids, textos):
+        # Remove as proposições que saíram do parquet ou cuja ementa mudou, e indexa as novas e as alteradas
+        atuais = {int(id): hash_texto(texto) for id, texto in zip(ids, textos)}
+        obsoletos = [
+            id for id, h in zip(self.ids.tolist(), self.hashes.tolist()) if atuais.get(id) != h
+        ]
+        removidos = self.remover(obsoletos)
+        return self.adicionar(ids, textos), removidos
+
+    def buscar(self, consulta, k=20):
+        n_docs = len(self.ids)
+        if n_docs == 0:
+            return []
+
+        media_tamanho = max(self.tamanhos.mean(), 1.0)
+        scores = np.zeros(n_docs, dtype=np.float32)
+
+        for termo in set(tokenizar(consulta)):
+            i = self.vocabulario.get(termo)
+            if i is None:
+                continue
+            inicio, fim = self.offsets[i], self.offsets[i + 1]
+            docs, tfs = self.docs[inicio:fim], self.tfs[inicio:fim].astype(np.float32)
+
+            idf = np.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            norma = K1 * (1 - B + B * self.tamanhos[docs] / media_tamanho)
+            scores[docs] += idf * tfs * (K1 + 1) / (tfs + norma)
+
+        candidatos = np.flatnonzero(scores)
+        if len(candidatos) > k:
+            candidatos = candidatos[np.argpartition(-scores[candidatos], k)[:k]]
+        candidatos = candidatos[np.argsort(-scores[candidatos], kind="stable")]
+
+        return [(int(self.ids[doc]), float(scores[doc])) for doc in candidatos]
+
+    def salvar(self, path=INDICE_FILE):
+        tmp = f"{path}.tmp.npz"
+        np.savez(
+            tmp,
+            termos=np.asarray(self.termos, dtype=object).astype(str),
+            offsets=self.offsets,
+            docs=self.docs,
+            tfs=self.tfs,
+            tamanhos=self.tamanhos,
+            ids=self.ids,
+            hashes=self.hashes,
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def carregar(cls, path=INDICE_FILE):
+        with np.load(path) as dados:
+            return cls(**{nome: dados[nome] for nome in dados.files})
+
+
+def atualizar_indice(df, path=INDICE_FILE, coluna_id="id", coluna_texto="ementa"):
+    indice = IndiceBM25.carregar(path) if os.path.exists(path) else IndiceBM25()
+    adicionados, removidos = indice.sincronizar(df[coluna_id].tolist(), df[coluna_texto].tolist())
+    if adicionados or removidos or not os.path.exists(path):
+        indice.salvar(path)
+    print(f"Índice de busca: {adicionados} proposições indexadas, {removidos} removidas, {len(indice)} no total")
+    return indice
@@ -0,0 +1,203 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from urllib.parse import urlparse
+
+CACHE_DIR = "data/.cache"
+CACHE_FILE = os.path.join(CACHE_DIR, "http.sqlite")
+
+# normal: respeita o TTL e revalida com GET condicional quando expira
+# refresh: sempre revalida com GET condicional
+# cache: usa apenas o que está em cache, sem acessar a rede
+# bypass: ignora o cache por completo
+MODOS = ("normal", "refresh", "cache", "bypass")
+
+# TTL em segundos por endpoint, avaliado na ordem (o primeiro que casar com o path vence)
+TTL_ENDPOINTS = [
+    ("/despesas", 6 * 3600),
+    ("/proposicoes", 12 * 3600),
+    ("/deputados", 24 * 3600),
+]
+TTL_PADRAO = 3600
+
+MAX_BYTES_PADRAO = 512 * 1024 * 1024
+
+
+class CacheMiss(LookupError):
+    pass
+
+
+def chave_cache(url, params=None):
+    # Parâmetros ordenados para que a mesma consulta gere sempre a mesma chave
+    itens = sorted((str(k), json.dumps(v, sort_keys=True)) for k, v in (params or {}).items())
+    return hashlib.sha256(json.dumps([url, itens]).encode("utf-8")).hexdigest()
+
+
+def ttl_endpoint(url, ttls=None):
+    path = urlparse(url).path
+    for sufixo, ttl in ttls or TTL_ENDPOINTS:
+        if sufixo in path:
+            return ttl
+    return TTL_PADRAO
+
+
+class _Armazenamento:
+    def __init__(self, path, max_bytes):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "revalidados": 0, "gravados": 0, "removidos": 0}
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS respostas (
+                chave TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                gravado_em REAL NOT NULL,
+                ultimo_acesso REAL NOT NULL,
+                tamanho INTEGER NOT NULL,
+                corpo BLOB NOT NULL
+            )
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_ultimo_acesso ON respostas (ultimo_acesso)")
+        self.conn.commit()
+
+
+class CacheHTTP:
+    def __init__(self, path=CACHE_FILE, modo="normal", max_bytes=MAX_BYTES_PADRAO, ttls=None, _armazenamento=None):
+        if modo not in MODOS:
+            raise ValueError(f"Modo de cache inválido: {modo}. Use um de {MODOS}")
+        self.modo = modo
+        self.ttls = ttls
+        self._db = _armazenamento or _Armazenamento(path, max_bytes)
+
+    def com_modo(self, modo):
+        # Mesmo armazenamento e estatísticas, apenas outro modo de uso
+        return CacheHTTP(modo=modo, ttls=self.ttls, _armazenamento=self._db)
+
+    @property
+    def stats(self):
+        return dict(self._db.stats)
+
+    def _contar(self, campo):
+        with self._db.lock:
+            self._db.stats[campo] += 1
+
+    def consultar(self, url, params=None):
+        chave = chave_cache(url, params)
+        with self._db.lock:
+            row = self._db.conn.execute(
+                "SELECT etag, last_modified, gravado_em, corpo FROM respostas WHERE chave = ?", (chave,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.conn.execute("UPDATE respostas SET ultimo_acesso = ? WHERE chave = ?", (time.time(), chave))
+            self._db.conn.commit()
+
+        etag, last_modified, gravado_em, corpo = row
+        return {
+            "etag": etag,
+            "last_modified": last_modified,
+            "fresco": time.time() - gravado_em < ttl_endpoint(url, self.ttls),
+            "data": json.loads(corpo),
+        }
+
+    def gravar(self, url, params, data, etag=None, last_modified=None):
+        corpo = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        agora = time.time()
+        with self._db.lock:
+            self._db.conn.execute(
+                "INSERT OR REPLACE INTO respostas VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (chave_cache(url, params), url, etag, last_modified, agora, agora, len(corpo), corpo),
+            )
+            self._db.stats["gravados"] += 1
+            self._remover_excedente()
+            self._db.conn.commit()
+
+    def renovar(self, url, params=None):
+        # Resposta 304: o conteúdo continua válido por mais um TTL
+        agora = time.time()
+        with self._db.lock:
+            self._db.conn.execute(
+                "UPDATE respostas SET gravado_em = ?, ultimo_acesso = ? WHERE chave = ?",
+                (agora, agora, chave_cache(url, params)),
+            )
+            self._db.conn.commit()
+
+    def _remover_excedente(self):
+        # LRU: remove as entradas acessadas há mais tempo até voltar ao limite
+        total = self._db.conn.execute("SELECT COALESCE(SUM(tamanho), 0) FROM respostas").fetchone()[0]
+        if total <= self._db.max_bytes:
+            return
+
+        for chave, tamanho in self._db.conn.execute(
+            "SELECT chave, tamanho FROM respostas ORDER BY ultimo_acesso"
+        ).fetchall():
+            if total <= self._db.max_bytes:
+                break
+            self._db.conn.execute("DELETE FROM respostas WHERE chave = ?", (chave,))
+            self._db.stats["removidos"] += 1
+            total -= tamanho
+
+    def get_json(self, url, params, fetch):
+        if self.modo == "bypass":
+            return fetch(url, params, {}).json()
+
+        cached = self.consultar(url, params)
+
+        if self.modo == "cache":
+            if cached is None:
+                self._contar("misses")
+                raise CacheMiss(f"Resposta não encontrada no cache: {url}")
+            self._contar("hits")
+            return cached["data"]
+
+        if cached is not None and cached["fresco"] and self.modo == "normal":
+            self._contar("hits")
+            return cached["data"]
+
+        # GET condicional: o servidor responde 304 se nada mudou
+        headers = {}
+        if cached is not None:
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        response = fetch(url, params, headers)
+        if response.status_code == 304 and cached is not None:
+            self._contar("revalidados")
+            self.renovar(url, params)
+            return cached["data"]
+
+        self._contar("misses")
+        data = response.json()
+        self.gravar(url, params, data, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        return data
+
+    def __str__(self):
+        s = self.stats
+        return (
+            f"cache HTTP: {s['hits']} hits, {s['misses']} misses, {s['revalidados']} revalidados (304), "
+            f"{s['gravados']} gravados, {s['removidos']} removidos"
+        )
+
+
+_cache_padrao = None
+_lock_padrao = threading.Lock()
+
+
+def obter_cache(modo=None):
+    global _cache_padrao
+    # Etapas do pipeline rodam em threads: sem o lock, duas poderiam abrir conexões SQLite separadas
+    with _lock_padrao:
+        if _cache_padrao is None:
+            _cache_padrao = CacheHTTP(modo=os.environ.get("CAMARA_CACHE_MODO", "normal"))
+    return _cache_padrao.com_modo(modo) if modo else _cache_padrao
@@ -0,0 +1,201 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import dataclasses
+
+from executor_llm import erros_temporarios
+from metricas import metricas, BUCKETS_TAMANHO
+
+CACHE_DIR = "data/.cache"
+CACHE_FILE = os.path.join(CACHE_DIR, "llm.sqlite")
+
+MAX_BYTES_PADRAO = 256 * 1024 * 1024
+MAX_IDADE_PADRAO = 30 * 24 * 3600
+
+
+class RespostaCache:
+    # Imita a interface usada do GenerateContentResponse (apenas .text)
+    def __init__(self, text):
+        self.text = text
+
+
+def _serializar_config(generation_config):
+    if generation_config is None:
+        return None
+    if dataclasses.is_dataclass(generation_config):
+        return dataclasses.asdict(generation_config)
+    if isinstance(generation_config, dict):
+        return generation_config
+    return vars(generation_config)
+
+
+def chave_prompt(model_name, prompt, generation_config=None):
+    conteudo = json.dumps(
+        [model_name, prompt, _serializar_config(generation_config)],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+
+class CacheLLM:
+    def __init__(self, path=CACHE_FILE, max_bytes=MAX_BYTES_PADRAO, max_idade=MAX_IDADE_PADRAO):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_idade = max_idade
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "removidos": 0, "latencia_economizada_s": 0.0}
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS respostas (
+                chave TEXT PRIMARY KEY,
+                modelo TEXT NOT NULL,
+                texto TEXT NOT NULL,
+                latencia REAL NOT NULL,
+                gravado_em REAL NOT NULL,
+                ultimo_acesso REAL NOT NULL,
+                tamanho INTEGER NOT NULL
+            )
+            """
+        )
+        self.conn.commit()
+
+    def consultar(self, chave):
+        agora = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT texto, latencia, gravado_em FROM respostas WHERE chave = ?", (chave,)
+            ).fetchone()
+
+            if row is None or agora - row[2] > self.max_idade:
+                self.stats["misses"] += 1
+                return None
+
+            self.conn.execute("UPDATE respostas SET ultimo_acesso = ? WHERE chave = ?", (agora, chave))
+            self.conn.commit()
+            self.stats["hits"] += 1
+            self.stats["latencia_economizada_s"] += row[1]
+
+        return row[0]
+
+    def remover(self, chave):
+        with self.lock:
+            self.conn.execute("DELETE FROM respostas WHERE chave = ?", (chave,))
+            self.conn.commit()
+
+    def gravar(self, chave, modelo, texto, latencia):
+        agora = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO respostas VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (chave, modelo, texto, latencia, agora, agora, len(texto.encode("utf-8"))),
+            )
+            self._remover_excedente(agora)
+            self.conn.commit()
+
+    def _remover_excedente(self, agora):
+        # Primeiro remove as entradas vencidas, depois as menos usadas até voltar ao limite de tamanho
+        removidos = self.conn.execute(
+            "DELETE FROM respostas WHERE gravado_em < ?", (agora - self.max_idade,)
+        ).rowcount
+        total = self.conn.execute("SELECT COALESCE(SUM(tamanho), 0) FROM respostas").fetchone()[0]
+
+        if total > self.max_bytes:
+            for chave, tamanho in self.conn.execute(
+                "SELECT chave, tamanho FROM respostas ORDER BY ultimo_acesso"
+            ).fetchall():
+                if total <= self.max_bytes:
+                    break
+                self.conn.execute("DELETE FROM respostas WHERE chave = ?", (chave,))
+                removidos += 1
+                total -= tamanho
+
+        self.stats["removidos"] += removidos
+
+    def __str__(self):
+        s = self.stats
+        return (
+            f"cache LLM: {s['hits']} hits, {s['misses']} misses, {s['removidos']} removidos, "
+            f"{s['latencia_economizada_s']:.1f}s de latência economizada"
+        )
+
+
+def _registrar_erro(modelo, erro):
+    resultado = "erro_temporario" if isinstance(erro, erros_temporarios()) else "erro"
+    metricas.incrementar("llm_chamadas_total", modelo=modelo, resultado=resultado)
+
+
+class ModeloComCache:
+    # Envolve um GenerativeModel e só chama a API para prompts ainda não vistos. Toda chamada ao modelo
+    # passa por aqui (direta, pelo ExecutorLLM ou em streaming), então as métricas do LLM são registradas nesta classe
+    def __init__(self, model, cache=None):
+        self.model = model
+        self.cache = cache or CacheLLM()
+
+    @property
+    def model_name(self):
+        return self.model.model_name
+
+    def generate_content(self, prompt, generation_config=None, stream=False, **kwargs):
+        chave = chave_prompt(self.model_name, prompt, generation_config)
+        modelo = self.model_name
+        metricas.observar("llm_prompt_caracteres", len(prompt), limites=BUCKETS_TAMANHO, modelo=modelo)
+
+        texto = self.cache.consultar(chave)
+        if texto is not None:
+            metricas.incrementar("llm_chamadas_total", modelo=modelo, resultado="cache")
+            return [RespostaCache(texto)] if stream else RespostaCache(texto)
+
+        if stream:
+            return self._stream(chave, prompt, generation_config, **kwargs)
+
+        inicio = time.perf_counter()
+        try:
+            response = self.model.generate_content(prompt, generation_config=generation_config, **kwargs)
+        except Exception as e:
+            _registrar_erro(modelo, e)
+            raise
+        latencia = time.perf_counter() - inicio
+
+        metricas.observar("llm_latencia_segundos", latencia, modelo=modelo)
+        metricas.incrementar("llm_chamadas_total", modelo=modelo, resultado="ok")
+        metricas.observar("llm_resposta_caracteres", len(response.text), limites=BUCKETS_TAMANHO, modelo=modelo)
+        self.cache.gravar(chave, modelo, response.text, latencia)
+
+        return response
+
+    def _stream(self, chave, prompt, generation_config, **kwargs):
+        # Repassa os pedaços assim que chegam e só grava no cache a resposta completa
+        # A latência registrada vai até o último pedaço, e não só até o primeiro
+        modelo = self.model_name
+        inicio = time.perf_counter()
+        partes = []
+        try:
+            for chunk in self.model.generate_content(prompt, generation_config=generation_config, stream=True, **kwargs):
+                try:
+                    partes.append(chunk.text)
+                except ValueError:
+                    pass
+                yield chunk
+        except Exception as e:
+            _registrar_erro(modelo, e)
+            raise
+        latencia = time.perf_counter() - inicio
+        texto = "".join(partes)
+
+        metricas.observar("llm_latencia_segundos", latencia, modelo=modelo)
+        metricas.incrementar("llm_chamadas_total", modelo=modelo, resultado="ok")
+        metricas.observar("llm_resposta_caracteres", len(texto), limites=BUCKETS_TAMANHO, modelo=modelo)
+        self.cache.gravar(chave, modelo, texto, latencia)
+
+    def invalidar(self, prompt, generation_config=None):
+        self.cache.remover(chave_prompt(self.model_name, prompt, generation_config))
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
@@ -0,0 +1,93 @@
+import sys
+import argparse
+import subprocess
+
+from cache_http import MODOS as MODOS_CACHE
+from metricas import metricas
+from pipeline import ETAPAS, executar, main as main_pipeline
+
+
+def _modulo_etapa(etapa):
+    tipo, _ = etapa.funcao.split(":", 1)
+    return None if tipo == "script" else tipo
+
+
+def medir_importtime(codigo, top=10):
+    # Roda em um processo novo para medir o cold start real, sem módulos já importados
+    resultado = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        capture_output=True,
+        text=True,
+    )
+
+    modulos = []
+    for linha in resultado.stderr.splitlines():
+        if not linha.startswith("import time:") or "cumulative" in linha:
+            continue
+        partes = linha[len("import time:"):].split("|")
+        modulos.append((int(partes[1]), int(partes[0]), partes[2][1:].rstrip()))
+
+    # Apenas módulos de nível superior (sem indentação) somam o total sem contar duas vezes
+    total = sum(cumulativo for cumulativo, _, nome in modulos if not nome.startswith("  "))
+    maiores = sorted(modulos, reverse=True)[:top]
+
+    return total, maiores
+
+
+def relatorio_importtime(nome_etapa, top=10):
+    etapa = next(etapa for etapa in ETAPAS if etapa.nome == nome_etapa)
+    modulo = _modulo_etapa(etapa) or "pipeline"
+
+    total, maiores = medir_importtime(f"import {modulo}", top)
+    # Referência: o mesmo import somado ao google.generativeai, que antes era carregado sempre
+    total_llm, _ = medir_importtime(f"import {modulo}, google.generativeai", top)
+
+    print(f"Cold start da etapa '{nome_etapa}' (import {modulo}): {total / 1000:.1f} ms")
+    print(f"Com google.generativeai carregado no import: {total_llm / 1000:.1f} ms")
+    print(f"Fração: {total / max(total_llm, 1):.0%}\n")
+
+    print(f"{'cumulativo (ms)':>16} | {'próprio (ms)':>13} | módulo")
+    for cumulativo, proprio, nome in maiores:
+        print(f"{cumulativo / 1000:16.1f} | {proprio / 1000:13.1f} | {nome.strip()}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Etapas do pipeline de dados da Câmara dos Deputados")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    subparsers.add_parser("pipeline", help="Executa o pipeline completo (aceita --only/--from/--force)", add_help=False)
+
+    importtime = subparsers.add_parser("importtime", help="Mede o tempo de import de uma etapa")
+    importtime.add_argument("etapa", choices=[etapa.nome for etapa in ETAPAS])
+    importtime.add_argument("--top", type=int, default=10)
+
+    for etapa in ETAPAS:
+        sub = subparsers.add_parser(etapa.nome, help=f"Executa a etapa {etapa.funcao}")
+        sub.add_argument("--force", action="store_true", help="Executa mesmo que as entradas não tenham mudado")
+        sub.add_argument("--incremental", action="store_true", help="Ingestão incremental das despesas")
+        sub.add_argument("--processos", type=int, default=1, help="Processos da agregação da série diária")
+        sub.add_argument("--cache-modo", choices=MODOS_CACHE, help="Modo do cache HTTP da etapa")
+        sub.add_argument("--profile", choices=["cprofile", "pyinstrument"], help="Grava um perfil da etapa")
+        if etapa.gerada:
+            sub.add_argument("--executar-gerados", action="store_true", help="Confirma a execução do script gerado pelo LLM")
+
+    argv = sys.argv[1:] if argv is None else argv
+    args, resto = parser.parse_known_args(argv)
+
+    if args.comando == "pipeline":
+        main_pipeline(resto)
+    elif args.comando == "importtime":
+        relatorio_importtime(args.etapa, args.top)
+    else:
+        if resto:
+            parser.error(f"argumentos não reconhecidos: {' '.join(resto)}")
+        etapa = next(etapa for etapa in ETAPAS if etapa.nome == args.comando)
+        if etapa.gerada and not args.executar_gerados:
+            parser.error(f"a etapa {etapa.nome} executa código gerado pelo LLM; revise-o e use --executar-gerados")
+        opcoes = {"incremental": args.incremental, "processos": args.processos, "cache_modo": args.cache_modo}
+        executar(ETAPAS, [etapa], force=args.force, max_workers=1, perfil=args.profile, opcoes=opcoes)
+        print(f"Métricas: {', '.join(metricas.gravar())}")
+
+
+if __name__ == "__main__":
+    main()
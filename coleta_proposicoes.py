@@ -0,0 +1,169 @@
+import os
+import datetime
+from urllib.parse import urlparse, parse_qs
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from api_camara import BASE_URL, Estatisticas, criar_sessao, get_json
+
+PROPOSICOES_FILE = "data/proposicoes_deputados.parquet"
+TEMAS = ["40", "46", "62"]
+DIAS_POR_JANELA = 30
+ITENS = 100
+
+# Cada página traz no máximo ITENS proposições: as linhas ficam em memória até completar um row group
+LINHAS_POR_ROW_GROUP = 65_536
+
+# Esquema fixo: todas as páginas são gravadas com os mesmos tipos, mesmo se vierem com campos nulos
+SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("uri", pa.string()),
+    ("siglaTipo", pa.string()),
+    ("codTipo", pa.int64()),
+    ("numero", pa.int64()),
+    ("ano", pa.int64()),
+    ("ementa", pa.string()),
+])
+
+
+def janelas(inicio, fim, dias=DIAS_POR_JANELA):
+    inicio, fim = datetime.date.fromisoformat(str(inicio)), datetime.date.fromisoformat(str(fim))
+    while inicio <= fim:
+        fim_janela = min(inicio + datetime.timedelta(days=dias - 1), fim)
+        yield inicio.isoformat(), fim_janela.isoformat()
+        inicio = fim_janela + datetime.timedelta(days=1)
+
+
+def ultima_pagina(data):
+    # O link "last" traz o número da última página; sem ele a consulta cabe em uma página só
+    for link in data.get("links", []):
+        if link.get("rel") == "last":
+            pagina = parse_qs(urlparse(link.get("href", "")).query).get("pagina")
+            if pagina:
+                return int(pagina[0])
+    return 1
+
+
+def _buscar_pagina(session, url, tema, janela, pagina, itens, stats, cache, **kwargs):
+    params = {
+        "codTema": tema,
+        "dataInicio": janela[0],
+        "dataFim": janela[1],
+        "itens": itens,
+        "pagina": pagina,
+        "ordem": "ASC",
+        "ordenarPor": "id",
+    }
+    return get_json(session, url, params=params, cache=cache, stats=stats, **kwargs)
+
+
+class ColetaIncompleta(Exception):
+    def __init__(self, falhas):
+        super().__init__(f"{len(falhas)} páginas de proposições falharam; o arquivo anterior foi mantido")
+        self.falhas = falhas
+
+
+class _EscritorParquet:
+    # Grava as páginas conforme chegam, descartando ids já vistos (a mesma proposição aparece em vários temas),
+    # em row groups de linhas_por_row_group linhas em vez de um row group minúsculo por página
+    def __init__(self, path, linhas_por_row_group=LINHAS_POR_ROW_GROUP):
+        self.path = path
+        self.tmp = f"{path}.tmp"
+        self.linhas_por_row_group = linhas_por_row_group
+        self.vistos = set()
+        self.pendentes = []
+        self.writer = pq.ParquetWriter(self.tmp, SCHEMA, write_statistics=True)
+
+    def escrever(self, linhas):
+        novas = 0
+        for linha in linhas:
+            if linha.get("id") not in self.vistos:
+                self.vistos.add(linha.get("id"))
+                self.pendentes.append(linha)
+                novas += 1
+        if len(self.pendentes) >= self.linhas_por_row_group:
+            self._gravar()
+        return novas
+
+    def _gravar(self):
+        if self.pendentes:
+            self.writer.write_table(pa.Table.from_pylist(self.pendentes, schema=SCHEMA), row_group_size=self.linhas_por_row_group)
+            self.pendentes = []
+
+    def concluir(self):
+        self._gravar()
+        self.writer.close()
+        os.replace(self.tmp, self.path)
+
+    def abortar(self):
+        self.writer.close()
+        os.remove(self.tmp)
+
+
+def coletar_proposicoes(
+    inicio,
+    fim,
+    temas=TEMAS,
+    path=PROPOSICOES_FILE,
+    base_url=BASE_URL,
+    dias_por_janela=DIAS_POR_JANELA,
+    itens=ITENS,
+    max_workers=16,
+    session=None,
+    stats=None,
+    cache=None,
+    **kwargs,
+):
+    session = session or criar_sessao(max_workers)
+    stats = stats or Estatisticas()
+    url = f"{base_url}/proposicoes"
+    escritor = _EscritorParquet(path)
+    falhas = []
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            def submeter(tema, janela, pagina):
+                return executor.submit(_buscar_pagina, session, url, tema, janela, pagina, itens, stats, cache, **kwargs)
+
+            # Primeiro a página 1 de cada tema × janela; as demais páginas são disparadas assim que
+            # a primeira revela quantas existem, sem esperar o link "next" de cada uma
+            pendentes = {
+                submeter(tema, janela, 1): (tema, janela, 1)
+                for tema in temas
+                for janela in janelas(inicio, fim, dias_por_janela)
+            }
+
+            while pendentes:
+                concluidos, _ = wait(pendentes, return_when=FIRST_COMPLETED)
+                for future in concluidos:
+                    tema, janela, pagina = pendentes.pop(future)
+                    try:
+                        data = future.result()
+                    except Exception as e:
+                        stats.registrar(erros=1)
+                        falhas.append((tema, janela, pagina))
+                        print(f"Erro ao buscar proposições (tema {tema}, {janela[0]} a {janela[1]}, página {pagina}): {e}")
+                        continue
+
+                    stats.registrar(linhas=escritor.escrever(data["dados"]))
+                    if pagina == 1:
+                        for proxima in range(2, ultima_pagina(data) + 1):
+                            pendentes[submeter(tema, janela, proxima)] = (tema, janela, proxima)
+    except BaseException:
+        escritor.abortar()
+        raise
+
+    print(f"Proposições: {stats}")
+    if cache is not None:
+        print(f"Proposições: {cache}")
+
+    # Com páginas faltando, o parquet completo anterior é mantido e a etapa falha, para ser executada de novo
+    if falhas:
+        escritor.abortar()
+        raise ColetaIncompleta(falhas)
+
+    escritor.concluir()
+
+    return len(escritor.vistos)
@@ -0,0 +1,135 @@
+import os
+import json
+
+import yaml
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import streamlit as st
+
+from busca import IndiceBM25
+
+# Colunas esperadas em cada artefato, validadas uma única vez por versão do arquivo
+COLUNAS_SERIE = ["deputado_id", "dataDocumento", "tipoDespesa", "valorDocumento", "valorLiquido"]
+COLUNAS_PROPOSICOES = ["id", "siglaTipo", "numero", "ano", "ementa"]
+CAMPOS_INSIGHTS_DESPESAS = ["maior_gasto", "maior_media_gastos_liquidos", "despesa_mais_frequente"]
+CAMPOS_INSIGHTS_DISTRIBUICAO = ["response"]
+
+
+class ErroDados(Exception):
+    pass
+
+
+def versao_arquivo(path):
+    # mtime e tamanho mudam sempre que o pipeline regrava o arquivo, o que gera uma nova entrada no cache
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _validar(nome, presentes, obrigatorias):
+    faltando = [col for col in obrigatorias if col not in presentes]
+    if faltando:
+        raise ErroDados(f"O arquivo '{nome}' não contém as colunas necessárias: {', '.join(faltando)}")
+
+
+# cache_resource mantém um único objeto por processo, compartilhado por todas as sessões
+# (cache_data devolveria uma cópia por chamada); os objetos retornados não devem ser alterados
+@st.cache_resource(max_entries=16, show_spinner=False)
+def _ler_json(path, versao, obrigatorias):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    _validar(path, data, obrigatorias)
+    return data
+
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def _ler_parquet(path, versao, obrigatorias):
+    df = pd.read_parquet(path)
+    _validar(path, df.columns, obrigatorias)
+    return df
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _ler_snapshot(path, versao, obrigatorias):
+    # Memory map do snapshot Arrow: as colunas apontam para o page cache, compartilhado por todas as
+    # sessões e processos; uma nova versão publicada pelo pipeline entra no cache pela chave de versão
+    table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+    _validar(path, table.column_names, obrigatorias)
+    return table
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _ler_yaml(path, versao, obrigatorias):
+    with open(path, "r") as f:
+        config = yaml.safe_load(f)
+    _validar(path, config, obrigatorias)
+    return config
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _ler_indice(path, versao, obrigatorias):
+    return IndiceBM25.carregar(path)
+
+
+def _carregar(leitor, path, obrigatorias):
+    try:
+        return leitor(path, versao_arquivo(path), tuple(obrigatorias))
+    except FileNotFoundError:
+        st.error(f"Arquivo não encontrado: {path}")
+    except json.JSONDecodeError:
+        st.error(f"Erro ao decodificar o arquivo JSON: {path}")
+    except ErroDados as e:
+        st.error(str(e))
+    except Exception as e:
+        st.error(f"Erro ao carregar o arquivo: {path}, Erro: {e}")
+    return None
+
+
+def carregar_json(path, obrigatorias=()):
+    return _carregar(_ler_json, path, obrigatorias)
+
+
+def carregar_parquet(path, obrigatorias=()):
+    return _carregar(_ler_parquet, path, obrigatorias)
+
+
+def carregar_snapshot(path, obrigatorias=()):
+    return _carregar(_ler_snapshot, path, obrigatorias)
+
+
+# Derivados da tabela calculados uma vez por versão do snapshot, e não a cada rerun; o argumento
+# _table não entra na chave do cache, que é formada pelo caminho, pela versão e pela coluna
+@st.cache_resource(max_entries=16, show_spinner=False)
+def _chaves(_table, path, versao, coluna):
+    return _table[coluna].to_numpy()
+
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def _valores_unicos(_table, path, versao, coluna):
+    return pc.unique(_table[coluna]).sort().to_pylist()
+
+
+def fatia_ordenada(table, coluna, valor, path):
+    # Tabela ordenada pela coluna (como a série, gravada por deputado): busca binária e conversão
+    # para pandas apenas das linhas do valor
+    chaves = _chaves(table, path, versao_arquivo(path), coluna)
+    inicio = np.searchsorted(chaves, valor, side="left")
+    fim = np.searchsorted(chaves, valor, side="right")
+    return table.slice(inicio, fim - inicio).to_pandas()
+
+
+def valores_unicos(table, coluna, path):
+    return _valores_unicos(table, path, versao_arquivo(path), coluna)
+
+
+def filtrar_valores(table, coluna, valores):
+    return table.filter(pc.is_in(table[coluna], value_set=pa.array(valores, type=table[coluna].type))).to_pandas()
+
+
+def carregar_yaml(path, obrigatorias=()):
+    return _carregar(_ler_yaml, path, obrigatorias)
+
+
+def carregar_indice(path):
+    return _carregar(_ler_indice, path, ())
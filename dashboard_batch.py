@@ -1,117 +1,128 @@
 # Código gerado para o Dashboard Streamlit
-import streamlit as st
 import pandas as pd
-import json
-
-@st.cache_data
-def load_json(filepath):
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        return data
-    except FileNotFoundError:
-        st.error(f"Arquivo JSON não encontrado: {filepath}")
-        return None
-    except json.JSONDecodeError:
-        st.error(f"Erro ao decodificar o arquivo JSON: {filepath}")
-        return None
-
-
-@st.cache_data
-def load_parquet(filepath):
-    try:
-        df = pd.read_parquet(filepath)
-        return df
-    except FileNotFoundError:
-        st.error(f"Arquivo Parquet não encontrado: {filepath}")
-        return None
-    except pd.errors.EmptyDataError:
-        st.error(f"Arquivo Parquet vazio: {filepath}")
-        return None
-    except Exception as e:
-        st.error(f"Erro ao carregar o arquivo Parquet: {filepath}, Erro: {e}")
-        return None
-
-
-def load_data():
-    insights_despesas = load_json('data/insights_despesas_deputados.json')
-    if insights_despesas is None: return None
-
-    required_cols_insights = ['maior_gasto', 'maior_media_gastos_liquidos', 'despesa_mais_frequente']
-    if not all(col in insights_despesas for col in required_cols_insights):
-        st.error("O arquivo 'insights_despesas_deputados.json' não contém as colunas necessárias.")
-        return None
-
+import plotly.express as px
+import streamlit as st
 
-    serie_despesas = load_parquet('data/serie_despesas_diarias_deputados.parquet')
-    if serie_despesas is None: return None
+from acesso_despesas import carregar_despesas_deputado
+from dados_dashboard import (
+    CAMPOS_INSIGHTS_DESPESAS,
+    COLUNAS_PROPOSICOES,
+    COLUNAS_SERIE,
+    carregar_indice,
+    carregar_json,
+    carregar_parquet,
+    carregar_snapshot,
+    fatia_ordenada,
+    filtrar_valores,
+    valores_unicos,
+)
+from downsampling import MAX_PONTOS, reamostrar, reduzir_linha
+from janelas_moveis import JANELAS, JANELAS_FILE, LIMIAR_Z, TODOS
+from snapshots import SNAPSHOTS
 
-    required_cols_serie = ['deputado_id', 'dataDocumento', 'tipoDespesa', 'valorDocumento', 'valorLiquido']
-    if not all(col in serie_despesas.columns for col in required_cols_serie):
-        st.error("O arquivo 'serie_despesas_diarias_deputados.parquet' não contém as colunas necessárias.")
-        return None
 
+# Leitura compartilhada entre sessões e invalidada quando o pipeline regrava o arquivo
+def load_json(filepath, obrigatorias=()):
+    return carregar_json(filepath, obrigatorias)
 
-    proposicoes_deputados = load_parquet('data/proposicoes_deputados.parquet')
-    if proposicoes_deputados is None: return None
 
-    required_cols_proposicoes = ['deputado_id', 'proposicao_id', 'data_apresentacao', 'ementa']
-    if not all(col in proposicoes_deputados.columns for col in required_cols_proposicoes):
-        st.error("O arquivo 'proposicoes_deputados.parquet' não contém as colunas necessárias.")
-        return None
+def load_parquet(filepath, obrigatorias=()):
+    return carregar_parquet(filepath, obrigatorias)
 
 
-    sumarizacao_proposicoes = load_json('data/sumarizacao_proposicoes.json')
-    if sumarizacao_proposicoes is None: return None
+st.set_page_config(page_title="Despesas", page_icon=":chart_with_upwards_trend:")
 
-    return insights_despesas, serie_despesas, proposicoes_deputados, sumarizacao_proposicoes
+insights = load_json("data/insights_despesas_deputados.json", CAMPOS_INSIGHTS_DESPESAS)
 
-import streamlit as st
-import pandas as pd
-import json
-import plotly.express as px
+serie = carregar_snapshot(SNAPSHOTS["serie_despesas"], COLUNAS_SERIE)
+cadastro = carregar_snapshot(SNAPSHOTS["deputados"], ["id", "nome"])
+nomes = dict(zip(cadastro["id"].to_pylist(), cadastro["nome"].to_pylist())) if cadastro is not None else {}
 
-st.set_page_config(page_title="Despesas", page_icon=":chart_with_upwards_trend:")
+deputados = valores_unicos(serie, "deputado_id", SNAPSHOTS["serie_despesas"]) if serie is not None else []
+deputado_selecionado = st.selectbox(
+    "Selecione o Deputado", deputados, format_func=lambda id: f"{nomes.get(id, id)} ({id})", key="deputado_select"
+)
 
-with open("data/insights_despesas_deputados.json", "r") as f:
-    insights = json.load(f)
+# Série ordenada por deputado no snapshot: só as linhas do deputado selecionado viram DataFrame
+if deputado_selecionado is not None:
+    df_deputado = fatia_ordenada(serie, "deputado_id", deputado_selecionado, SNAPSHOTS["serie_despesas"])
+else:
+    df_deputado = pd.DataFrame()
 
-df_despesas = pd.read_parquet("data/serie_despesas_diarias_deputados.parquet")
 
-deputados = df_despesas["deputado_id"].unique()
-deputado_selecionado = st.selectbox("Selecione o Deputado", deputados, key="deputado_select")
+if "dataDocumento" in df_deputado.columns and "valorLiquido" in df_deputado.columns:
+    datas = pd.to_datetime(df_deputado["dataDocumento"])
+    data_min, data_max = datas.min().date(), datas.max().date()
 
-df_deputado = df_despesas[df_despesas["deputado_id"] == deputado_selecionado]
+    # Intervalo visível: ao aproximar, a série é agregada de novo em uma resolução mais fina
+    if data_min < data_max:
+        inicio, fim = st.slider("Período", min_value=data_min, max_value=data_max, value=(data_min, data_max), key="periodo_despesas")
+    else:
+        inicio, fim = data_min, data_max
+    visualizacao = st.radio("Visualização", ["Barras", "Linha"], horizontal=True, key="visualizacao_despesas")
 
+    titulo = f"Série Temporal de Despesas - Deputado {deputado_selecionado}"
+    if visualizacao == "Barras":
+        df_grafico, resolucao = reamostrar(df_deputado, inicio, fim, MAX_PONTOS)
+        fig = px.bar(df_grafico, x="dataDocumento", y="valorLiquido", title=titulo)
+    else:
+        df_grafico, resolucao = reduzir_linha(df_deputado, inicio, fim, MAX_PONTOS), "LTTB"
+        fig = px.line(df_grafico, x="dataDocumento", y="valorLiquido", title=titulo)
 
-if "dataDocumento" in df_deputado.columns and "valorLiquido" in df_deputado.columns:
-    fig = px.bar(df_deputado, x="dataDocumento", y="valorLiquido", title=f"Série Temporal de Despesas - Deputado {deputado_selecionado}")
     st.plotly_chart(fig)
+    st.caption(f"{len(df_grafico)} pontos, resolução {resolucao}")
 else:
     st.error("Colunas 'dataDocumento' ou 'valorLiquido' não encontradas no DataFrame.")
 
-st.json(insights)
+# Janelas móveis e picos pré-calculados pela etapa de janelas do pipeline, lidos só para o deputado
+try:
+    janelas = carregar_despesas_deputado(deputado_selecionado, JANELAS_FILE) if deputado_selecionado is not None else None
+except FileNotFoundError:
+    janelas = None
+
+if janelas is not None and not janelas.empty:
+    total = janelas[janelas["tipoDespesa"] == TODOS]
+    ultimo = total.iloc[-1]
+    st.subheader(f"Gastos líquidos nas janelas móveis até {ultimo['dataDocumento']}")
+    for coluna, dias in zip(st.columns(len(JANELAS)), JANELAS):
+        coluna.metric(f"{dias} dias", f"R$ {ultimo[f'soma_{dias}d']:,.2f}")
+
+    picos = janelas[janelas["pico"]]
+    st.subheader(f"Picos de gasto (z-score acima de {LIMIAR_Z:g})")
+    if picos.empty:
+        st.caption("Nenhum pico identificado para este deputado.")
+    else:
+        st.dataframe(picos[["dataDocumento", "tipoDespesa", "valorLiquido", "media_historico", "zscore"]])
 
-import streamlit as st
-import pandas as pd
-import json
+if insights is not None:
+    st.json(insights)
+
+# Métricas pré-calculadas pela etapa de analytics do pipeline
+maiores_gastos = load_parquet("data/analytics/maiores_gastos.parquet")
+if maiores_gastos is not None:
+    st.subheader("Deputados com maiores gastos líquidos")
+    st.dataframe(maiores_gastos)
+
+despesas_tipo = load_parquet("data/analytics/despesas_tipo.parquet")
+if despesas_tipo is not None:
+    st.subheader("Proporção de gastos por tipo de despesa")
+    st.dataframe(despesas_tipo[["tipoDespesa", "valorLiquido", "media", "proporcao"]])
 
 st.title("Proposições")
 
-try:
-    proposicoes = pd.read_parquet("data/proposicoes_deputados.parquet")
-    required_cols = ["deputado_id", "proposicao_id", "data_apresentacao", "ementa"]
-    if not all(col in proposicoes.columns for col in required_cols):
-        st.error("Colunas obrigatórias ausentes no arquivo Parquet.")
+proposicoes = carregar_snapshot(SNAPSHOTS["proposicoes"], COLUNAS_PROPOSICOES)
+if proposicoes is not None:
+    termo = st.text_input("Buscar nas ementas", key="busca_ementas")
+    indice = carregar_indice("data/proposicoes_deputados.busca.npz") if termo else None
+
+    if indice is not None:
+        resultados = pd.DataFrame(indice.buscar(termo, k=50), columns=["id", "relevancia"])
+        encontradas = resultados.merge(filtrar_valores(proposicoes, "id", resultados["id"].tolist()), on="id")
+        st.caption(f"{len(encontradas)} proposições encontradas")
+        st.dataframe(encontradas)
     else:
         st.dataframe(proposicoes)
 
-    with open("data/sumarizacao_proposicoes.json", "r") as f:
-        sumario = json.load(f)
-        st.json(sumario)
-
-except FileNotFoundError:
-    st.error("Arquivos de dados não encontrados.")
-except Exception as e:
-    st.error(f"Ocorreu um erro: {e}")
-
+sumario = load_json("data/sumarizacao_proposicoes.json")
+if sumario is not None:
+    st.json(sumario)
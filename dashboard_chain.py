@@ -1,6 +1,6 @@
 import streamlit as st
-import json
-import yaml
+
+from dados_dashboard import CAMPOS_INSIGHTS_DISTRIBUICAO, carregar_json, carregar_yaml
 
 tab1, tab2, tab3 = st.tabs(["Overview", "Despesas", "Proposições"])
 
@@ -9,12 +9,12 @@ with tab1:
     st.subheader("Bem vindos ao Dashboard")
     st.image("docs/distribuicao_deputados.png")
 
-    with open('data/insights_distribuicao_deputados.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = carregar_json('data/insights_distribuicao_deputados.json', CAMPOS_INSIGHTS_DISTRIBUICAO)
+    if data is not None:
         st.write(data['response'])
 
-    with open('data/config.yaml', 'r') as file:
-        config = yaml.safe_load(file)
+    config = carregar_yaml('data/config.yaml', ['chave'])
+    if config is not None:
         st.write(config['chave'])
 
 with tab2:
@@ -1,442 +1,244 @@
 import os
 import json
-import requests
 import pandas as pd
-import google.generativeai as genai
-from google.generativeai.types import GenerationConfig
+import pyarrow.parquet as pq
 
 from dotenv import load_dotenv
 
+from agregacao import gravar_serie_diaria
+from analytics import carregar_tabela
+from api_camara import BASE_URL, criar_sessao, get_json, coletar_despesas
+from busca import atualizar_indice
+from deduplicacao import agrupar, relatorio_reducao
+from cache_http import obter_cache
+from coleta_proposicoes import coletar_proposicoes
+from fluxo_despesas import coletar_e_agregar
+from escrita_despesas import DESPESAS_FILE, EscritorDespesas
+from llm import ModeloLazy
+from respostas_llm import ModeloValidado, gerar_extraido
+from prompts import (
+    GRAFICO_DISTRIBUICAO,
+    INSIGHTS_DISTRIBUICAO,
+    CODIGO_ANALISE_DESPESAS,
+    INSIGHTS_DESPESAS,
+    DASHBOARD_CHAIN,
+    DASHBOARD_CARREGAR_DADOS,
+    DASHBOARD_ABA_DESPESAS,
+    DASHBOARD_ABA_PROPOSICOES,
+    compactar_tabela,
+)
+from executor_llm import ExecutorLLM
+from sumarizacao import sumarizar
+from ingestao_incremental import ingerir_despesas, carregar_despesas
+
 load_dotenv()
 
-genai.configure(api_key=os.environ["GENAI_API_KEY"])
-model = genai.GenerativeModel("gemini-1.5-flash")
+# O cliente do Gemini só é criado na primeira chamada ao modelo
+model = ModeloLazy("gemini-1.5-flash")
 
 
-def get_deputados():
-    response: requests.Response = requests.get(
-        "https://dadosabertos.camara.leg.br/api/v2/deputados"
-    )
+def get_deputados(cache_modo=None):
+    data = get_json(criar_sessao(), f"{BASE_URL}/deputados", cache=obter_cache(cache_modo))
 
-    deputados = response.json()["dados"]
+    deputados = data["dados"]
 
     return deputados
 
 
-def get_response_questao_3c():
-    deputados_df = pd.read_csv('data/distribuicao_deputados.csv')
-
-    dados_tabela = "\n".join(
-        f"{row['Partido']} | {row['Quantidade']} | {row['Porcentagem']}%"
-        for _, row in deputados_df.iterrows()
-    )
-
-    prompt = f"""
-    Você é um analista político especializado em ciência política e sociologia legislativa. Sua tarefa é analisar dados fornecidos sobre a distribuição de
-    deputados por partido na Câmara dos Deputados. Use insights qualitativos e quantitativos para responder às questões propostas.
-
-    Os dados estão formatados da seguinte forma:
-    Partido | Quantidade | Porcentagem
-    {dados_tabela}
-
-    Aqui estão exemplos de como estruturar suas respostas:
-    - Identifique tendências de coalizões com base nos partidos majoritários.
-    - Compare a proporção de deputados entre partidos ideologicamente alinhados e discuta a formação de blocos.
-    - Analise como a presença de partidos menores pode influenciar decisões estratégicas, considerando sua porcentagem.
-
-    Agora, com base nos dados fornecidos, responda:
-    1. Quais partidos têm maior probabilidade de liderar coalizões e como isso pode afetar a aprovação de propostas legislativas?
-    2. Como a proporção de deputados de partidos menores pode influenciar o equilíbrio de poder?
-    3. Quais dinâmicas parlamentares podem surgir entre partidos ideologicamente opostos?
-
-    Sua análise deve ser objetiva, detalhada e incluir projeções sobre o impacto legislativo da configuração atual.
-    """
-
-    response = model.generate_content(prompt)
-
-    return response
-
-
-def questao4(df):
-    distinct_ids = df['id'].unique().tolist()
-    base_url = "https://dadosabertos.camara.leg.br/api/v2/deputados/{id}/despesas"
-    all_data = []
-
-    # Rodando apenas para os 100 primeiros deputados, senão demora muito para rodar
-    for id in distinct_ids[:100]:
-        try:
-            response = requests.get(base_url.format(id=id))
-            response.raise_for_status()
-            data = response.json()
+def questao3(cache_modo=None):
+    deputados = get_deputados(cache_modo)
+    df_deputados = pd.DataFrame(deputados)
 
-            for item in data["dados"]:
-                item["deputado_id"] = id
-            all_data.extend(data["dados"])
+    df_deputados.to_parquet("data/deputados.parquet", index=False)
 
-        except Exception as e:
-            print(f"Erro ao processar ID {id}: {e}")
+    return df_deputados
 
-    df = pd.DataFrame(all_data)
 
-    return df
+def questao3b():
+    prompt = GRAFICO_DISTRIBUICAO.formatar()
 
+    # Código extraído do bloco markdown durante o streaming e validado antes de substituir o arquivo
+    gerar_extraido(model, prompt, "python", destino="questoes/questao3b.py")
 
-def questao4a(df):
-    df['dataDocumento'] = pd.to_datetime(df['dataDocumento'])
 
-    grouped_df = df.groupby([df['dataDocumento'].dt.date, 'deputado_id', 'tipoDespesa']).agg({
-        'valorDocumento': 'sum',
-        'valorLiquido': 'sum'
-    }).reset_index()
-
-    grouped_df.to_parquet("data/serie_despesas_diarias_deputados.parquet", index=False)
+def get_response_questao_3c():
+    deputados_df = pd.read_csv('data/distribuicao_deputados.csv')
 
+    # Tabela renderizada sem iterrows; partidos pequenos viram uma linha "Outros" se passar do orçamento
+    tabela = compactar_tabela(deputados_df, "Quantidade", "Partido", formatos={"Porcentagem": "%s%%"})
 
-def questao4b():
-    prompt = """
-    Você é um modelo de linguagem especializado em análise de dados.
-    Vou te solicitar uma análise em etapas.
-    Os dados sobre despesas de deputados estão em 'data/serie_despesas_diarias_deputados.parquet.
-    Aqui estão as colunas disponíveis:
-
-    - dataDocumento: Data do documento da despesa.
-    - deputado_id: Identificação do deputado.
-    - tipoDespesa: Tipo de despesa realizada.
-    - valorDocumento: Valor total do documento.
-    - valorLiquido: Valor líquido da despesa.
-
-    Siga as instruções abaixo para realizar a análise:
-
-    ### Etapa 1: Preparação dos dados
-    Escreva um código Python que carregue os dados parquet e realize o pré-processamento necessário. Isso inclui:
-    - Converter a coluna `dataDocumento` para o formato de data.
-    - Garantir que valores financeiros sejam interpretados como numéricos.
-    - Tratar valores ausentes, se necessário.
-
-    Depois de processar os dados, exiba as primeiras 5 linhas como exemplo.
-
-    ### Etapa 2: Análise dos maiores gastos
-    Com os dados preparados, identifique:
-    1. Os três deputados com os maiores valores líquidos totais de despesa, separados por tipo de despesa.
-    2. Para cada deputado, exiba o tipo de despesa mais frequente.
-
-    ### Etapa 3: Análise das despesas médias
-    Calcule:
-    1. A média de despesas líquidas por deputado, considerando o período total.
-    2. O tipo de despesa com a maior média de gastos líquidos.
-
-    ### Etapa 4: Proporção de gastos por tipo
-    Analise:
-    1. A proporção do valor líquido total de cada tipo de despesa em relação ao total geral de despesas líquidas.
-    2. Identifique os três tipos de despesas que representam a maior proporção do valor líquido total.
-
-    ### Finalização
-    Inclua comentários explicativos em cada etapa do código gerado.
-    Retorne apenas o código Python, sem a necessidade de executá-lo.
-    """
+    prompt = INSIGHTS_DISTRIBUICAO.formatar(tabela=tabela)
 
     response = model.generate_content(prompt)
 
-    with open("questoes/questao4b.py", "w") as file:
-        # Removendo o markdown do texto gerado
-        texto_limpado = response.text[9:-4].strip()
-        file.write(texto_limpado)
-
-def questao4c():
-    gastos_df = pd.read_csv("data/maiores_gastos.csv")
-    media_deputados_df = pd.read_csv("data/media_deputados.csv")
-    tipo_frequente_df = pd.read_csv("data/tipo_mais_frequente.csv")
-
-    prompt = """
-    Explique e responda cada pergunta
-
-    1. Qual é a categoria de maior gasto entre os deputados analisados?
-    Conhecimento: O maior gasto identificado foi na categoria '{}' com um valor total de R$ {:.2f}, conforme os dados analisados.
-
-    2. Qual é o deputado que apresenta a maior média de gastos líquidos?
-    Conhecimento: O deputado com a maior média de gastos líquidos é o de ID {}, com uma média de R$ {:.2f}, conforme os dados analisados.
-
-    3. Qual é o tipo de despesa mais frequente associado aos deputados?
-    Conhecimento: O tipo de despesa mais frequente é '{}', que aparece {} vezes nos dados analisados.
-
-    Retorne apenas o resultado em formato JSON
-    """.format(
-        gastos_df.groupby('tipoDespesa')['valorLiquido'].sum().idxmax(),
-        gastos_df.groupby('tipoDespesa')['valorLiquido'].sum().max(),
-
-        media_deputados_df.loc[media_deputados_df['valorLiquido'].idxmax(), 'deputado_id'],
-        media_deputados_df['valorLiquido'].max(),
+    return response
 
-        tipo_frequente_df['tipoDespesa'].value_counts().idxmax(),
-        tipo_frequente_df['tipoDespesa'].value_counts().max()
-    )
 
-    response = model.generate_content(prompt)
+def questao3c():
+    response = get_response_questao_3c()
+    data = {"response": response.text}
 
-    with open("data/insights_despesas_deputados.json", "w") as file:
-        # Removendo o markdown do texto gerado
-        texto_limpado = response.text[7:-4].strip()
-        file.write(texto_limpado)
+    with open("data/insights_distribuicao_deputados.json", 'w', encoding='utf-8') as file:
+        json.dump(data, file, ensure_ascii=False, indent=4)
 
 
-def questao5():
-    url = "https://dadosabertos.camara.leg.br/api/v2/proposicoes"
-    codigos = ["40", "46", "62"]
-    proposicoes = []
+def questao4(df, cache_modo=None):
+    distinct_ids = df['id'].unique().tolist()
 
-    for codigo in codigos:
-        params = {
-            "dataInicio": "2024-08-01",
-            "dataFim": "2024-08-30",
-            "codTema": codigo,
-            "itens": 10
-        }
+    # Coleta concorrente de todas as páginas de despesas de todos os deputados, gravadas em
+    # row groups conforme chegam, com schema compacto e memória constante
+    with EscritorDespesas(DESPESAS_FILE) as escritor:
+        coletar_despesas(distinct_ids, cache=obter_cache(cache_modo), escritor=escritor)
 
-        response = requests.get(url, params=params)
-        if response.status_code == 200:
-            data = response.json()
-            proposicoes.extend(data['dados'])
-        else:
-            print("Erro ao buscar proposições:", response.text)
+    return pq.read_table(DESPESAS_FILE, columns=["dataDocumento", "deputado_id", "tipoDespesa", "valorDocumento", "valorLiquido"])
 
-    return proposicoes
 
+def questao4_incremental(df):
+    distinct_ids = df['id'].unique().tolist()
 
-def questao_5a():
-    proposicoes = questao5()
+    # Busca apenas os meses posteriores ao watermark de cada deputado
+    ingerir_despesas(distinct_ids)
 
-    df = pd.DataFrame(proposicoes)
-    df.to_parquet("data/proposicoes_deputados.parquet", index=False)
+    return carregar_despesas()
 
-    return df
 
+def questao4a(df, processos=1):
+    # Agregação colunar em Arrow: datas em date32, tipoDespesa como dicionário e ids em int32;
+    # com processos > 1, particionada por período em um pool de processos
+    gravar_serie_diaria(df, "data/serie_despesas_diarias_deputados.parquet", processos=processos)
 
-def questao_5b():
-    data = questao_5a()
-    chunk_size = 10
-    overlap = 2
 
-    dialogues = data["ementa"].tolist()
+def questao4_fluxo(df, cache_modo=None):
+    distinct_ids = df['id'].unique().tolist()
 
-    chunks = []
-    start = 0
-    while start < len(dialogues):
-        end = min(start + chunk_size, len(dialogues))
-        chunks.append(dialogues[start:end])
-        if end == len(dialogues):
-            break
-        start += chunk_size - overlap
+    # Coleta, conversão e agregação sobrepostas, sem materializar todas as despesas em memória
+    coletar_e_agregar(
+        distinct_ids, "data/serie_despesas_diarias_deputados.parquet", DESPESAS_FILE, cache=obter_cache(cache_modo)
+    )
 
-    chunk_prompts = [
-        f"Resuma os seguintes textos de proposições:\n\n" +
-        "\n".join([f"{i+1}. {line}" for i, line in enumerate(chunk)])
-        for chunk in chunks
-    ]
 
-    chunk_summaries = {}
-    generation_config = GenerationConfig(max_output_tokens=500)
-    for idx, chunk_prompt in enumerate(chunk_prompts):
-        response = model.generate_content(chunk_prompt, generation_config=generation_config)
-        chunk_summaries.update({idx: response.text})
+def questao4_despesas(incremental=False, processos=1, cache_modo=None):
+    df_deputados = pd.read_parquet("data/deputados.parquet")
 
-    with open("data/sumarizacao_proposicoes.json", "w") as file:
-        json.dump(chunk_summaries, file, ensure_ascii=False, indent=4)
+    if incremental:
+        # A ingestão incremental controla o que buscar pelos watermarks, sem o cache HTTP
+        questao4a(questao4_incremental(df_deputados), processos)
+    elif processos > 1:
+        # Com vários processos a agregação só começa após a coleta, mas usa todos os núcleos
+        questao4a(questao4(df_deputados, cache_modo), processos)
+    else:
+        questao4_fluxo(df_deputados, cache_modo)
 
 
-def questao6():
-    prompt = """
-    Pergunta: Me retorne apenas o trecho de código Python para gerar duas abas no Streamlit com o nome 'Bem-vindos' e 'Sobre',
-    com o titulo 'Olá, bem vindo' na aba 'Bem-vindos' e a descrição "Essa é a nossa página principal".
-    Resposta:
+def questao4b():
+    prompt = CODIGO_ANALISE_DESPESAS.formatar()
 
-    tab1, tab2 = st.tabs(["Bem-vindos", "Sobre"])
+    gerar_extraido(model, prompt, "python", destino="questoes/questao4b.py")
 
-    with tab1:
-        st.header("Olá, bem vindo")
-        st.subheader("Essa é a nossa página principal")
+def questao4c():
+    # Tabelas materializadas pela etapa de analytics, sem reagrupar a série
+    gastos_df = carregar_tabela("maiores_gastos")
+    deputados_df = carregar_tabela("despesas_deputado")
+
+    gastos_por_tipo = gastos_df.groupby('tipoDespesa')['valorLiquido'].sum()
+    tipo_frequente = deputados_df['tipo_mais_frequente'].value_counts()
+
+    prompt = INSIGHTS_DESPESAS.formatar(
+        categoria=gastos_por_tipo.idxmax(),
+        valor_categoria=gastos_por_tipo.max(),
+        deputado_id=deputados_df.loc[deputados_df['media'].idxmax(), 'deputado_id'],
+        media=deputados_df['media'].max(),
+        tipo=tipo_frequente.idxmax(),
+        frequencia=tipo_frequente.max(),
+    )
 
-    with tab2:
-        st.header("Sobre")
+    # Só grava o arquivo se o conteúdo do bloco for um JSON válido
+    gerar_extraido(model, prompt, "json", destino="data/insights_despesas_deputados.json")
 
-    Pergunta: Me retorne apenas o trecho de código Python para adicionar a aba com o nome 'Bem-vindos' uma imagem chamada 'bem_vindos.png'.
-    Resposta:
 
-    tab1 = st.tabs(["Bem-vindos"])
+def questao5(inicio="2024-08-01", fim="2024-08-30", cache_modo=None):
+    # Temas × janelas de datas × páginas coletados em paralelo e gravados direto no parquet
+    return coletar_proposicoes(inicio, fim, temas=["40", "46", "62"], cache=obter_cache(cache_modo))
 
-    with tab1:
-        st.image("bem_vindos.png")
 
-    Pergunta: Me retorne apenas o trecho de código Python para adicionar a aba com o nome 'Bem-vindos' um arquivo YAML chamado 'data/config.yaml' e retornar a chave 'chave' do arquivo
-    Resposta:
+def questao_5a(cache_modo=None):
+    questao5(cache_modo=cache_modo)
 
-    tab1 = st.tabs(["Bem-vindos"])
+    df = pd.read_parquet("data/proposicoes_deputados.parquet")
 
-    with tab1:
-        json_file = 'respostas.json'
-        key = 'asjdhds
+    # Índice de busca das ementas, atualizado apenas com as proposições novas
+    atualizar_indice(df, "data/proposicoes_deputados.busca.npz")
 
-        with open(json_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            st.write(data[key])
+    return df
 
-    Pergunta: Me retorne apenas o trecho de código Python para adicionar a aba com o nome 'Bem-vindos' e carregar um json chamado 'data/teste.json' com a key 'asjdhds' e exibi-lo no Streamlit.
-    Resposta:
 
-    tab1 = st.tabs(["Bem-vindos"])
+def questao_5b(data=None):
+    # Reaproveita as proposições já gravadas por questao_5a em vez de buscá-las de novo
+    if data is None:
+        data = pd.read_parquet("data/proposicoes_deputados.parquet")
 
-    with tab1:
-        json_file = 'teste.json'
-        key = 'asjdhds
+    data = data.dropna(subset=["ementa"])
+    ementas = data["ementa"].tolist()
 
-        with open(json_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            st.write(data[key])
+    # Ementas quase idênticas (mesma redação com outro número de lei, por exemplo) são agrupadas
+    # e só o representante de cada cluster é enviado ao modelo
+    clusters = agrupar(data["id"].tolist(), ementas)
+    with open("data/clusters_proposicoes.json", "w") as file:
+        json.dump(clusters, file, ensure_ascii=False, indent=4)
 
-    Pergunta: Me retorne apenas o trecho de código Python para adicionar a aba com o nome 'Bem-vindos' e ler um arquivo YAML chamado 'teste.yaml' e retornar a chave 'testando' do arquivo.
-    Resposta:
+    reducao = relatorio_reducao(ementas, clusters)
+    print(
+        f"Deduplicação: {reducao['ementas']} ementas em {reducao['clusters']} clusters, "
+        f"tokens de entrada {reducao['tokens_antes']} -> {reducao['tokens_depois']} "
+        f"({reducao['reducao']:.1%} a menos)"
+    )
 
-    tab1 = st.tabs(["Bem-vindos"])
+    # Chunks por orçamento de tokens, resumidos em paralelo e consolidados hierarquicamente; cada resumo
+    # parcial registra os ids de todas as proposições dos clusters que cobriu, e não só dos representantes
+    sumarizar(
+        model,
+        [cluster["ementa"] for cluster in clusters],
+        "data/sumarizacao_proposicoes.json",
+        ids=[cluster["membros"] for cluster in clusters],
+    )
 
-    with tab1:
-        yaml_file = "teste.yaml"
-        key = "testando"
 
-        with open(yaml_file, "r") as file:
-            config = yaml.safe_load(file)
-            st.write(config[key])
+def questao6(destino=None):
+    prompt = DASHBOARD_CHAIN.formatar()
 
-    Pergunta: Me retorne apenas o trecho de código Python para gerar três abas no Streamlit com o nome 'Overview', 'Despesas' e 'Proposições',
-    com o titulo 'Overview', descrição "Bem vindos ao Dashboard", uma imagem chamada 'docs/distribuicao_deputados.png', carregar um json chamado 'data/insights_distribuicao_deputados.json'
-    com a key 'response' e exibi-lo no Streamlit e ler um arquivo YAML chamado 'data/config.yaml' e retornar a chave 'chave' do arquivo. na aba 'Overview'?
-    Resposta:
-    """
+    return gerar_extraido(model, prompt, "python", destino=destino)
 
-    response = model.generate_content(prompt)
 
-    # Removendo o markdown do texto gerado
-    texto_limpado = response.text[9:-4].strip()
-    return texto_limpado
+def questao6_dashboard(destino="questoes/dashboard_chain.py"):
+    # O código gerado vai para questoes/, para comparação com o dashboard_chain.py mantido no repositório
+    questao6(destino)
 
 
 def generate_code(prompts):
-    responses = []
-    for i, prompt in enumerate(prompts):
-        print(f"Processando {i + 1}/{len(prompts)}...")
-        response = model.generate_content(prompt)
-        responses.append(response.text)
-    return responses
+    print(f"Processando {len(prompts)} prompts em paralelo...")
+    # Cada resposta é extraída e validada com ast.parse; só as inválidas são pedidas de novo
+    responses = ExecutorLLM(ModeloValidado(model, "python")).map(prompts)
+    return [response.text for response in responses]
 
 
-def questao7():
+def questao7(destino="questoes/dashboard_batch.py"):
     prompts = [
-        # Prompt para carregar dados
-        """
-        Escreva apenas o código Python para carregar dados necessários em um dashboard Streamlit:
-        - Crie funções para carregar arquivos JSON e Parquet.
-        - Utilize o decorador @st.cache_data para otimizar a performance.
-        - Os arquivos estão localizados nos seguintes caminhos fixos:
-            - data/insights_despesas_deputados.json
-            - data/serie_despesas_diarias_deputados.parquet
-            - data/proposicoes_deputados.parquet
-            - data/sumarizacao_proposicoes.json
-        - Garanta que as funções respeitem as colunas dos arquivos:
-            - `data/insights_despesas_deputados.json` contém os campos: maior_gasto, maior_media_gastos_liquidos (id_deputado), despesa_mais_frequente.
-            - `data/serie_despesas_diarias_deputados.parquet` contém: deputado_id, dataDocumento, tipoDespesa, valorDocumento, valorLiquido.
-            - `data/proposicoes_deputados.parquet` contém: deputado_id, proposicao_id, data_apresentacao, ementa.
-            - `data/sumarizacao_proposicoes.json` contém: resumos categorizados das proposições.
-        - Antes de manipular os DataFrames, verifique se as colunas necessárias existem. Caso não existam, exiba um erro com `st.error` e não execute as operações seguintes.
-        Retorne apenas o código Python.
-        """,
-
-        # Prompt para a aba "Despesas"
-        """
-        Escreva apenas o código Python para implementar a aba "Despesas" em um dashboard Streamlit:
-        - Mostre insights das despesas a partir do arquivo JSON localizado em data/insights_despesas_deputados.json.
-        - Adicione um st.selectbox para selecionar deputados utilizando o campo deputado_id do arquivo Parquet localizado em data/serie_despesas_diarias_deputados.parquet.
-        - Exiba um gráfico de barras da série temporal de despesas do deputado selecionado, utilizando as colunas:
-            - deputado_id: para identificar o deputado selecionado.
-            - dataDocumento: como o eixo X representando a data.
-            - valorLiquido: como o eixo Y representando o valor líquido das despesas.
-        - Certifique-se de que o selectbox usa deputado_id como valor identificador.
-        - Antes de criar o gráfico, verifique se as colunas dataDocumento e valorLiquido existem no DataFrame. Caso contrário, exiba um erro com `st.error`.
-        Não inclua explicações ou comentários. Retorne apenas o código Python.
-        """,
-
-        # Prompt para a aba "Proposições"
-        """
-        Escreva apenas o código Python para implementar a aba "Proposições" em um dashboard Streamlit:
-        - Exiba uma tabela com os dados das proposições carregados do arquivo Parquet localizado em data/proposicoes_deputados.parquet.
-        - Mostre um resumo das proposições carregado do arquivo JSON localizado em data/sumarizacao_proposicoes.json.
-        - Inclua uma verificação para garantir que as colunas deputado_id, proposicao_id, data_apresentacao, ementa existam no DataFrame antes de manipulá-lo. Caso as colunas estejam ausentes,
-        exiba uma mensagem de erro com `st.error` e não prossiga.
-        Não inclua explicações ou comentários. Retorne apenas o código Python.
-        """
+        DASHBOARD_CARREGAR_DADOS.formatar(),
+        DASHBOARD_ABA_DESPESAS.formatar(),
+        DASHBOARD_ABA_PROPOSICOES.formatar(),
     ]
 
     responses = generate_code(prompts)
 
-    with open("dashboard_batch.py", "w") as f:
+    # Assim como em questao6_dashboard, não sobrescreve o dashboard_batch.py mantido no repositório
+    with open(f"{destino}.tmp", "w") as f:
         f.write("# Código gerado para o Dashboard Streamlit\n")
         for response in responses:
-            texto_limpado = response[9:-4].strip()
-            f.write(texto_limpado + "\n\n")
+            f.write(response + "\n\n")
+    os.replace(f"{destino}.tmp", destino)
 
 
 if __name__ == "__main__":
-    #Questão 3
-    deputados = get_deputados()
-    df_deputados = pd.DataFrame(deputados)
-
-    prompt ="""
-    Retorne apenas um script em Python utilizando as bibliotecas matplotlib e pandas que gere um gráfico de pizza representando o número total e o percentual
-    de deputados de cada partido a partir do conjunto de dados data/deputados.parquet. Considere que os dados serão lidos com o pandas, a coluna siglaPartido
-    contem o nome dos partidos. O gráfico de pizza deve conter:
-    1.	Os rótulos mostrando o nome do partido.
-    2.	A quantidade e o percentual de deputados de cada partido no formato: 'Partido: Qtd (%Perc)'.
-    3.	Um título para o gráfico.
-    Após criar o código do gráfico, salve-o no arquivo docs/distribuicao_deputados.png com alta qualidade.
-    Garanta que o código seja bem estruturado e utilize boas práticas, como comentários explicativos.
-    """
-
-    response = model.generate_content(prompt)
-    with open("questoes/questao3b.py", "w") as file:
-        # Removendo o markdown do texto gerado
-        texto_limpado = response.text[9:-4].strip()
-        file.write(texto_limpado)
-
-    response = get_response_questao_3c()
-    data = {"response": response.text}
-
-    with open("data/insights_distribuicao_deputados.json", 'w', encoding='utf-8') as file:
-        json.dump(data, file, ensure_ascii=False, indent=4)
-
-    df_deputados.to_parquet("data/deputados.parquet", index=False)
-
-    # Questão 4
-    df_despesas = questao4(df_deputados)
-
-    # Questão 4a
-    df_agrupado = questao4a(df_despesas)
-
-    # Questão 4b
-    questao4b()
-
-    # Questão 4c
-    questao4c()
-
-    # Questão 5
-    questao5()
-
-    # Questao 5a:
-    questao_5a()
-
-    # Questao 5b
-    questao_5b()
-
-    #Questão 6 completa
-    result = questao6()
-    with open("dashboard_chain.py", "w") as file:
-        file.write(result)
+    from pipeline import main
 
-    #Questão 7 Completa
-    questao7()
\ No newline at end of file
+    main()
@@ -0,0 +1,106 @@
+import zlib
+
+import numpy as np
+
+from busca import tokenizar
+from executor_llm import estimar_tokens
+
+NUM_PERMUTACOES = 128
+# 16 bandas de 8 linhas: pares com Jaccard acima de ~0,7 caem no mesmo bucket com alta probabilidade
+BANDAS = 16
+LIMIAR = 0.7
+TAMANHO_SHINGLE = 3
+
+_PRIMO = (1 << 61) - 1
+
+
+def shingles(texto, k=TAMANHO_SHINGLE):
+    # Números (de leis, anos, artigos) viram um marcador: ementas que só diferem neles são a mesma redação
+    tokens = ["#" if token.isdigit() else token for token in tokenizar(texto)]
+    if len(tokens) < k:
+        return {" ".join(tokens)}
+    return {" ".join(tokens[i:i + k]) for i in range(len(tokens) - k + 1)}
+
+
+class MinHasher:
+    def __init__(self, num_permutacoes=NUM_PERMUTACOES, seed=42):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, 1 << 31, num_permutacoes, dtype=np.uint64)
+        self.b = rng.integers(0, 1 << 31, num_permutacoes, dtype=np.uint64)
+
+    def assinatura(self, texto):
+        # crc32 em vez de hash() para que as assinaturas não mudem entre execuções
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in shingles(texto)),
+            dtype=np.uint64,
+        )
+        # Todas as permutações de uma vez: (a * h + b) mod p, e o mínimo por permutação
+        valores = (np.outer(hashes, self.a) + self.b) % _PRIMO
+        return valores.min(axis=0)
+
+
+class _UnionFind:
+    def __init__(self, n):
+        self.pai = list(range(n))
+
+    def raiz(self, i):
+        while self.pai[i] != i:
+            self.pai[i] = self.pai[self.pai[i]]
+            i = self.pai[i]
+        return i
+
+    def unir(self, i, j):
+        ri, rj = self.raiz(i), self.raiz(j)
+        if ri != rj:
+            self.pai[max(ri, rj)] = min(ri, rj)
+
+
+def agrupar(ids, textos, limiar=LIMIAR, bandas=BANDAS, minhasher=None):
+    minhasher = minhasher or MinHasher()
+
+    # A mesma proposição pode vir de mais de um tema: ids repetidos são descartados antes de tudo
+    vistos = {}
+    for id, texto in zip(ids, textos):
+        vistos.setdefault(id, texto)
+    ids, textos = list(vistos), list(vistos.values())
+
+    if not textos:
+        return []
+
+    assinaturas = np.array([minhasher.assinatura(texto) for texto in textos])
+    linhas = assinaturas.shape[1] // bandas
+    uf = _UnionFind(len(textos))
+
+    # LSH: documentos com uma banda idêntica viram candidatos; cada um é comparado só com o
+    # primeiro do bucket, o que mantém o custo linear mesmo com buckets grandes
+    for banda in range(bandas):
+        buckets = {}
+        for i, chave in enumerate(map(bytes, assinaturas[:, banda * linhas:(banda + 1) * linhas])):
+            primeiro = buckets.setdefault(chave, i)
+            if primeiro != i and np.mean(assinaturas[primeiro] == assinaturas[i]) >= limiar:
+                uf.unir(primeiro, i)
+
+    grupos = {}
+    for i in range(len(textos)):
+        grupos.setdefault(uf.raiz(i), []).append(i)
+
+    return [
+        {
+            "representante": ids[raiz],
+            "ementa": textos[raiz],
+            "membros": [ids[i] for i in membros],
+        }
+        for raiz, membros in grupos.items()
+    ]
+
+
+def relatorio_reducao(textos, clusters):
+    tokens_antes = sum(estimar_tokens(texto) for texto in textos)
+    tokens_depois = sum(estimar_tokens(cluster["ementa"]) for cluster in clusters)
+    return {
+        "ementas": len(textos),
+        "clusters": len(clusters),
+        "tokens_antes": tokens_antes,
+        "tokens_depois": tokens_depois,
+        "reducao": round(1 - tokens_depois / max(tokens_antes, 1), 4),
+    }
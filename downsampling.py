@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+MAX_PONTOS = 400
+
+# Resoluções disponíveis, da mais fina para a mais grossa
+FREQUENCIAS = [
+    ("D", "diária", 1),
+    ("W-MON", "semanal", 7),
+    ("MS", "mensal", 30),
+    ("QS", "trimestral", 91),
+    ("YS", "anual", 365),
+]
+
+
+def escolher_frequencia(inicio, fim, max_pontos=MAX_PONTOS):
+    dias = (pd.Timestamp(fim) - pd.Timestamp(inicio)).days + 1
+    for freq, nome, dias_por_ponto in FREQUENCIAS:
+        if dias / dias_por_ponto <= max_pontos:
+            return freq, nome
+    return FREQUENCIAS[-1][:2]
+
+
+def serie_diaria(df, coluna_data="dataDocumento", coluna_valor="valorLiquido"):
+    # Soma os tipos de despesa de cada dia em um único ponto
+    datas = pd.to_datetime(df[coluna_data])
+    return df[coluna_valor].groupby(datas).sum().sort_index()
+
+
+def reamostrar(df, inicio=None, fim=None, max_pontos=MAX_PONTOS, coluna_data="dataDocumento", coluna_valor="valorLiquido"):
+    serie = serie_diaria(df, coluna_data, coluna_valor)
+    if serie.empty:
+        return pd.DataFrame({coluna_data: [], coluna_valor: []}), "diária"
+
+    inicio = pd.Timestamp(inicio) if inicio is not None else serie.index.min()
+    fim = pd.Timestamp(fim) if fim is not None else serie.index.max()
+    serie = serie[(serie.index >= inicio) & (serie.index <= fim)]
+
+    # A resolução depende apenas do intervalo visível: ao aproximar, a série volta a ser mais detalhada
+    freq, nome = escolher_frequencia(inicio, fim, max_pontos)
+    if freq != "D":
+        serie = serie.resample(freq).sum()
+        serie = serie[serie != 0]
+
+    return serie.rename(coluna_valor).rename_axis(coluna_data).reset_index(), nome
+
+
+def lttb(x, y, n):
+    # Largest-Triangle-Three-Buckets: mantém os pontos que preservam a forma visual da série
+    tamanho = len(x)
+    if n >= tamanho or n < 3:
+        return np.arange(tamanho)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    limites = np.linspace(1, tamanho - 1, n - 1).astype(np.int64)
+
+    indices = np.empty(n, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = tamanho - 1
+    anterior = 0
+
+    for i in range(n - 2):
+        inicio, fim = limites[i], limites[i + 1]
+        proximo_fim = limites[i + 2] if i + 2 < len(limites) else tamanho
+        # Média do próximo bucket como terceiro vértice do triângulo
+        media_x = x[fim:proximo_fim].mean()
+        media_y = y[fim:proximo_fim].mean()
+
+        areas = np.abs(
+            (x[anterior] - media_x) * (y[inicio:fim] - y[anterior])
+            - (x[anterior] - x[inicio:fim]) * (media_y - y[anterior])
+        )
+        anterior = inicio + int(np.argmax(areas))
+        indices[i + 1] = anterior
+
+    return indices
+
+
+def reduzir_linha(df, inicio=None, fim=None, max_pontos=MAX_PONTOS, coluna_data="dataDocumento", coluna_valor="valorLiquido"):
+    serie = serie_diaria(df, coluna_data, coluna_valor)
+    if inicio is not None:
+        serie = serie[serie.index >= pd.Timestamp(inicio)]
+    if fim is not None:
+        serie = serie[serie.index <= pd.Timestamp(fim)]
+
+    indices = lttb(serie.index.asi8, serie.to_numpy(), max_pontos)
+    return serie.iloc[indices].rename(coluna_valor).rename_axis(coluna_data).reset_index()
@@ -0,0 +1,138 @@
+import os
+import threading
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from agregacao import _para_date32
+
+DESPESAS_FILE = "data/despesas_deputados.parquet"
+
+# Páginas são convertidas para Arrow a cada LINHAS_POR_LOTE linhas e gravadas em row groups de tamanho fixo:
+# a memória fica limitada a um row group, qualquer que seja o número de deputados ou anos
+LINHAS_POR_LOTE = 8_192
+LINHAS_POR_ROW_GROUP = 65_536
+
+# Valores em centavos exatos; texto repetido (tipos, fornecedores) como dicionário
+VALOR = pa.decimal128(12, 2)
+TEXTO_REPETIDO = pa.dictionary(pa.int32(), pa.string())
+
+SCHEMA = pa.schema([
+    ("deputado_id", pa.int32()),
+    ("ano", pa.int16()),
+    ("mes", pa.int8()),
+    ("tipoDespesa", TEXTO_REPETIDO),
+    ("codDocumento", pa.int64()),
+    ("tipoDocumento", TEXTO_REPETIDO),
+    ("codTipoDocumento", pa.int32()),
+    ("dataDocumento", pa.date32()),
+    ("numDocumento", pa.string()),
+    ("valorDocumento", VALOR),
+    ("urlDocumento", pa.string()),
+    ("nomeFornecedor", TEXTO_REPETIDO),
+    ("cnpjCpfFornecedor", TEXTO_REPETIDO),
+    ("valorLiquido", VALOR),
+    ("valorGlosa", VALOR),
+    ("numRessarcimento", pa.string()),
+    ("codLote", pa.int64()),
+    ("parcela", pa.int32()),
+])
+
+
+def _converter_coluna(valores, campo):
+    if campo.type == VALOR:
+        # A API devolve float: arredonda para centavos antes de converter para decimal
+        return pc.cast(pc.round(pa.array(valores, type=pa.float64(), from_pandas=True), 2), VALOR)
+    if pa.types.is_date32(campo.type):
+        return _para_date32(pa.array(valores, from_pandas=True))
+    if pa.types.is_string(campo.type):
+        # Alguns campos (numDocumento, numRessarcimento) vêm ora como número, ora como texto
+        return pa.array([None if v is None else str(v) for v in valores], type=pa.string())
+    return pa.array(valores, type=campo.type, from_pandas=True)
+
+
+def para_lote(paginas):
+    # paginas: [(deputado_id, dados)], convertidas coluna a coluna direto dos dicts da API
+    colunas = {"deputado_id": [id for id, dados in paginas for _ in dados]}
+    for campo in SCHEMA:
+        if campo.name != "deputado_id":
+            colunas[campo.name] = [item.get(campo.name) for _, dados in paginas for item in dados]
+    return pa.RecordBatch.from_arrays(
+        [_converter_coluna(colunas[campo.name], campo) for campo in SCHEMA], schema=SCHEMA
+    )
+
+
+class EscritorDespesas:
+    # Recebe páginas de várias threads e grava row groups de LINHAS_POR_ROW_GROUP linhas conforme enchem
+    def __init__(self, path=DESPESAS_FILE, linhas_por_lote=LINHAS_POR_LOTE, linhas_por_row_group=LINHAS_POR_ROW_GROUP):
+        self.path = path
+        self.tmp = f"{path}.tmp"
+        self.linhas_por_lote = linhas_por_lote
+        self.linhas_por_row_group = linhas_por_row_group
+        self._lock = threading.Lock()
+        self.paginas = []
+        self.linhas_paginas = 0
+        self.lotes = []
+        self.linhas_lotes = 0
+        self.linhas = 0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.writer = pq.ParquetWriter(self.tmp, SCHEMA, write_statistics=True)
+
+    def adicionar(self, deputado_id, dados):
+        with self._lock:
+            self.paginas.append((deputado_id, dados))
+            self.linhas_paginas += len(dados)
+            if self.linhas_paginas >= self.linhas_por_lote:
+                self._converter()
+
+    def escrever(self, lote):
+        # Lote já convertido (ex.: pela etapa de conversão do fluxo de despesas)
+        with self._lock:
+            self._acumular(lote)
+
+    def _converter(self):
+        if self.paginas:
+            lote = para_lote(self.paginas)
+            self.paginas, self.linhas_paginas = [], 0
+            self._acumular(lote)
+
+    def _acumular(self, lote):
+        self.lotes.append(lote)
+        self.linhas_lotes += lote.num_rows
+        if self.linhas_lotes >= self.linhas_por_row_group:
+            self._gravar(final=False)
+
+    def _gravar(self, final):
+        table = pa.Table.from_batches(self.lotes, schema=SCHEMA)
+        # Só row groups completos são gravados; o resto espera os próximos lotes (ou o fim)
+        n = table.num_rows if final else table.num_rows - table.num_rows % self.linhas_por_row_group
+        if n:
+            self.writer.write_table(table.slice(0, n), row_group_size=self.linhas_por_row_group)
+            self.linhas += n
+        resto = table.slice(n)
+        self.lotes = resto.to_batches()
+        self.linhas_lotes = resto.num_rows
+
+    def concluir(self):
+        with self._lock:
+            self._converter()
+            self._gravar(final=True)
+            self.writer.close()
+        os.replace(self.tmp, self.path)
+        return self.linhas
+
+    def abortar(self):
+        self.writer.close()
+        os.remove(self.tmp)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, *exc):
+        if tipo is None:
+            self.concluir()
+        else:
+            self.abortar()
+        return False
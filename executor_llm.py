@@ -0,0 +1,165 @@
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from metricas import metricas
+
+# Limites do plano gratuito do gemini-1.5-flash
+RPM_PADRAO = 15
+TPM_PADRAO = 1_000_000
+
+
+class ErroQuota(Exception):
+    pass
+
+
+_erros_temporarios = None
+
+
+def erros_temporarios():
+    # Importado só quando necessário: google.api_core carrega o grpc
+    global _erros_temporarios
+    if _erros_temporarios is None:
+        try:
+            from google.api_core import exceptions as google_exceptions
+
+            _erros_temporarios = (
+                ErroQuota,
+                google_exceptions.ResourceExhausted,
+                google_exceptions.TooManyRequests,
+                google_exceptions.ServiceUnavailable,
+                google_exceptions.InternalServerError,
+                google_exceptions.DeadlineExceeded,
+            )
+        except ImportError:
+            _erros_temporarios = (ErroQuota,)
+    return _erros_temporarios
+
+
+def estimar_tokens(texto):
+    # Aproximação de ~4 caracteres por token, suficiente para controlar a taxa
+    return max(1, len(texto) // 4)
+
+
+class TokenBucket:
+    def __init__(self, capacidade, por_minuto):
+        self.capacidade = capacidade
+        self.taxa = por_minuto / 60.0
+        self.disponivel = capacidade
+        self.ultimo = time.monotonic()
+        self.lock = threading.Lock()
+
+    def adquirir(self, quantidade=1):
+        # Pedidos maiores que a capacidade esperam o balde encher por completo
+        quantidade = min(quantidade, self.capacidade)
+        while True:
+            with self.lock:
+                agora = time.monotonic()
+                self.disponivel = min(self.capacidade, self.disponivel + (agora - self.ultimo) * self.taxa)
+                self.ultimo = agora
+
+                if self.disponivel >= quantidade:
+                    self.disponivel -= quantidade
+                    return
+                espera = (quantidade - self.disponivel) / self.taxa
+
+            time.sleep(espera)
+
+
+class ExecutorLLM:
+    def __init__(self, model, max_workers=4, rpm=RPM_PADRAO, tpm=TPM_PADRAO, max_retries=5, backoff=2.0):
+        self.model = model
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.requisicoes = TokenBucket(rpm, rpm)
+        self.tokens = TokenBucket(tpm, tpm)
+
+    def _gerar(self, prompt, generation_config=None, **kwargs):
+        if isinstance(generation_config, dict):
+            max_saida = generation_config.get("max_output_tokens") or 0
+        else:
+            max_saida = getattr(generation_config, "max_output_tokens", None) or 0
+        tokens = estimar_tokens(prompt) + max_saida
+
+        # Latência, tamanhos e resultado de cada chamada são registrados pelo ModeloComCache; aqui, só as novas tentativas
+        modelo = getattr(self.model, "model_name", None) or getattr(self.model, "nome", "desconhecido")
+
+        for tentativa in range(self.max_retries + 1):
+            self.requisicoes.adquirir()
+            self.tokens.adquirir(tokens)
+            try:
+                return self.model.generate_content(prompt, generation_config=generation_config, **kwargs)
+            except erros_temporarios():
+                if tentativa == self.max_retries:
+                    raise
+                metricas.incrementar("llm_retries_total", modelo=modelo)
+                # Backoff exponencial com jitter completo
+                time.sleep(random.uniform(0, self.backoff * 2 ** tentativa))
+
+    def map(self, prompts, generation_config=None, ao_concluir=None, **kwargs):
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self._gerar, prompt, generation_config, **kwargs) for prompt in prompts]
+
+            # ao_concluir(idx, response) é chamado na ordem em que as respostas chegam
+            if ao_concluir is not None:
+                indices = {future: idx for idx, future in enumerate(futures)}
+                for future in as_completed(futures):
+                    ao_concluir(indices[future], future.result())
+
+            # Resultados retornam na mesma ordem dos prompts de entrada
+            return [future.result() for future in futures]
+
+
+class ModeloFalso:
+    # Backend local para testes e benchmarks sem acesso à API
+    def __init__(self, latencia=0.5, taxa_erro_quota=0.0, model_name="models/modelo-falso"):
+        self.latencia = latencia
+        self.taxa_erro_quota = taxa_erro_quota
+        self.model_name = model_name
+        self.chamadas = 0
+        self.lock = threading.Lock()
+
+    def generate_content(self, prompt, generation_config=None, stream=False, **kwargs):
+        with self.lock:
+            self.chamadas += 1
+        time.sleep(self.latencia)
+
+        if random.random() < self.taxa_erro_quota:
+            raise ErroQuota("429 Resource has been exhausted")
+
+        texto = self.responder(prompt)
+        if stream:
+            # Resposta em pedaços de tamanho fixo, como no streaming da API
+            return [type("RespostaFalsa", (), {"text": texto[i:i + 16]})() for i in range(0, len(texto), 16)]
+        return type("RespostaFalsa", (), {"text": texto})()
+
+    def responder(self, prompt):
+        return f"Resumo ({estimar_tokens(prompt)} tokens): {prompt[:80]}"
+
+
+def medir_speedup(n_prompts=20, latencia=0.2, max_workers=8):
+    prompts = [f"Resuma a proposição {i}" for i in range(n_prompts)]
+    sem_limite = {"rpm": 10_000, "tpm": 10_000_000}
+
+    inicio = time.perf_counter()
+    serial = ExecutorLLM(ModeloFalso(latencia), max_workers=1, **sem_limite).map(prompts)
+    tempo_serial = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    paralelo = ExecutorLLM(ModeloFalso(latencia), max_workers=max_workers, **sem_limite).map(prompts)
+    tempo_paralelo = time.perf_counter() - inicio
+
+    assert [r.text for r in serial] == [r.text for r in paralelo]
+
+    return {
+        "prompts": n_prompts,
+        "serial_s": round(tempo_serial, 3),
+        "paralelo_s": round(tempo_paralelo, 3),
+        "speedup": round(tempo_serial / tempo_paralelo, 2),
+    }
+
+
+if __name__ == "__main__":
+    print(medir_speedup())
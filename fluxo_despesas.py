@@ -0,0 +1,202 @@
+import time
+import asyncio
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+
+import pyarrow as pa
+
+from acesso_despesas import gravar_ordenado
+from agregacao import SCHEMA_SAIDA, agregar_despesas_diarias, normalizar
+from api_camara import BASE_URL, Estatisticas, criar_sessao, get_json, proximo_link
+from escrita_despesas import EscritorDespesas, para_lote
+
+SERIE_FILE = "data/serie_despesas_diarias_deputados.parquet"
+
+# Tamanho das filas entre as etapas: quando uma etapa atrasa, a anterior espera em vez de acumular memória
+MAX_PAGINAS_FILA = 256
+MAX_LOTES_FILA = 8
+
+# Páginas são convertidas para Arrow em lotes, e o agregador consolida a soma parcial a cada tantas linhas
+LINHAS_POR_LOTE = 20_000
+LINHAS_POR_AGREGACAO = 500_000
+
+# Sinal de fim enviado pela etapa anterior
+FIM = None
+
+
+class Ocupacao:
+    # Tempo em que cada etapa esteve trabalhando (e não esperando a fila), para ver qual é o gargalo
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.etapas = {}
+
+    def registrar(self, etapa, duracao):
+        self.etapas[etapa] = self.etapas.get(etapa, 0.0) + duracao
+
+    def __str__(self):
+        total = max(time.perf_counter() - self.inicio, 1e-9)
+        etapas = ", ".join(f"{etapa} {duracao:.2f}s" for etapa, duracao in self.etapas.items())
+        return f"{total:.2f}s no total ({etapas})"
+
+
+class AgregadorIncremental:
+    # Soma os lotes conforme chegam: a agregação diária é associativa, então a soma parcial
+    # é reagregada junto com os lotes pendentes sem precisar guardar as linhas originais
+    def __init__(self, linhas_por_agregacao=LINHAS_POR_AGREGACAO):
+        self.linhas_por_agregacao = linhas_por_agregacao
+        self.parcial = SCHEMA_SAIDA.empty_table()
+        self.pendentes = []
+        self.linhas_pendentes = 0
+
+    def adicionar(self, lote):
+        table = normalizar(pa.Table.from_batches([lote]))
+        self.pendentes.append(table)
+        self.linhas_pendentes += table.num_rows
+        if self.linhas_pendentes >= self.linhas_por_agregacao:
+            self.consolidar()
+
+    def consolidar(self):
+        if self.pendentes:
+            tabelas = [normalizar(self.parcial), *self.pendentes]
+            self.parcial = agregar_despesas_diarias(pa.concat_tables(tabelas))
+            self.pendentes = []
+            self.linhas_pendentes = 0
+        return self.parcial
+
+
+async def _produzir_ids(ids, fila_ids, n_coletores):
+    for id in ids:
+        await fila_ids.put(id)
+    for _ in range(n_coletores):
+        await fila_ids.put(FIM)
+
+
+async def _coletar(loop, executor, session, base_url, params, fila_ids, fila_paginas, stats, cache, kwargs):
+    # Cada coletor busca as páginas de um deputado por vez e as repassa assim que chegam
+    while (id := await fila_ids.get()) is not FIM:
+        url, params_pagina = f"{base_url}/deputados/{id}/despesas", params
+        try:
+            while url:
+                buscar = partial(get_json, session, url, params_pagina, cache=cache, stats=stats, **kwargs)
+                data = await loop.run_in_executor(executor, buscar)
+                stats.registrar(linhas=len(data["dados"]))
+                await fila_paginas.put((id, data["dados"]))
+                # O link "next" já contém todos os parâmetros da consulta
+                url, params_pagina = proximo_link(data), None
+        except Exception as e:
+            # As páginas já repassadas permanecem; requisitar já esgotou os retries antes de chegar aqui
+            stats.registrar(erros=1)
+            print(f"Erro ao processar ID {id}: {e}")
+
+
+async def _converter(loop, executor, fila_paginas, filas_lotes, linhas_por_lote, ocupacao):
+    paginas, linhas = [], 0
+
+    async def enviar():
+        inicio = time.perf_counter()
+        # Lote já no schema compacto das despesas, compartilhado pelo agregador e pelo escritor
+        lote = await loop.run_in_executor(executor, para_lote, paginas)
+        ocupacao.registrar("conversão", time.perf_counter() - inicio)
+        for fila in filas_lotes:
+            await fila.put(lote)
+
+    while (pagina := await fila_paginas.get()) is not FIM:
+        paginas.append(pagina)
+        linhas += len(pagina[1])
+        if linhas >= linhas_por_lote:
+            await enviar()
+            paginas, linhas = [], 0
+
+    if paginas:
+        await enviar()
+    for fila in filas_lotes:
+        await fila.put(FIM)
+
+
+async def _agregar(loop, executor, fila_lotes, agregador, ocupacao):
+    while (lote := await fila_lotes.get()) is not FIM:
+        inicio = time.perf_counter()
+        await loop.run_in_executor(executor, agregador.adicionar, lote)
+        ocupacao.registrar("agregação", time.perf_counter() - inicio)
+
+
+async def _escrever(loop, executor, fila_lotes, escritor, ocupacao):
+    while (lote := await fila_lotes.get()) is not FIM:
+        inicio = time.perf_counter()
+        await loop.run_in_executor(executor, escritor.escrever, lote)
+        ocupacao.registrar("escrita", time.perf_counter() - inicio)
+
+
+async def _executar(ids, path, destino_despesas, base_url, max_workers, params, linhas_por_lote, linhas_por_agregacao, session, stats, cache, kwargs):
+    loop = asyncio.get_running_loop()
+    ocupacao = Ocupacao()
+    agregador = AgregadorIncremental(linhas_por_agregacao)
+    escritor = EscritorDespesas(destino_despesas) if destino_despesas is not None else None
+
+    fila_ids = asyncio.Queue(maxsize=max_workers)
+    fila_paginas = asyncio.Queue(maxsize=MAX_PAGINAS_FILA)
+    fila_lotes = asyncio.Queue(maxsize=MAX_LOTES_FILA)
+    fila_escrita = asyncio.Queue(maxsize=MAX_LOTES_FILA)
+    filas_lotes = [fila_lotes, fila_escrita] if escritor is not None else [fila_lotes]
+
+    # Rede em um pool de threads; conversão, agregação e escrita em threads próprias, para não travar o loop
+    with ThreadPoolExecutor(max_workers=max_workers) as rede, \
+            ThreadPoolExecutor(max_workers=1) as conversao, \
+            ThreadPoolExecutor(max_workers=1) as agregacao, \
+            ThreadPoolExecutor(max_workers=1) as escrita:
+
+        async def coletores():
+            inicio = time.perf_counter()
+            async with asyncio.TaskGroup() as grupo:
+                for _ in range(max_workers):
+                    grupo.create_task(
+                        _coletar(loop, rede, session, base_url, params, fila_ids, fila_paginas, stats, cache, kwargs)
+                    )
+            ocupacao.registrar("coleta", time.perf_counter() - inicio)
+            await fila_paginas.put(FIM)
+
+        # Se uma etapa falhar, o TaskGroup cancela as outras, que estariam bloqueadas nas filas
+        try:
+            async with asyncio.TaskGroup() as grupo:
+                grupo.create_task(_produzir_ids(ids, fila_ids, max_workers))
+                grupo.create_task(coletores())
+                grupo.create_task(_converter(loop, conversao, fila_paginas, filas_lotes, linhas_por_lote, ocupacao))
+                grupo.create_task(_agregar(loop, agregacao, fila_lotes, agregador, ocupacao))
+                if escritor is not None:
+                    grupo.create_task(_escrever(loop, escrita, fila_escrita, escritor, ocupacao))
+        except BaseException:
+            if escritor is not None:
+                escritor.abortar()
+            raise
+
+        inicio = time.perf_counter()
+        if escritor is not None:
+            await loop.run_in_executor(escrita, escritor.concluir)
+        table = await loop.run_in_executor(agregacao, agregador.consolidar)
+        if path is not None:
+            table = await loop.run_in_executor(agregacao, gravar_ordenado, table, path)
+        ocupacao.registrar("gravação", time.perf_counter() - inicio)
+
+    return table, ocupacao
+
+
+def coletar_e_agregar(
+    ids, path=SERIE_FILE, destino_despesas=None, base_url=BASE_URL, max_workers=16, itens=100, params=None,
+    linhas_por_lote=LINHAS_POR_LOTE, linhas_por_agregacao=LINHAS_POR_AGREGACAO,
+    session=None, stats=None, cache=None, **kwargs,
+):
+    # Coleta, conversão e agregação sobrepostas: o tempo total tende ao da etapa mais lenta
+    session = session or criar_sessao(max_workers)
+    stats = stats or Estatisticas()
+    params = {"itens": itens, **(params or {})}
+
+    table, ocupacao = asyncio.run(_executar(
+        ids, path, destino_despesas, base_url, max_workers, params, linhas_por_lote, linhas_por_agregacao, session, stats, cache, kwargs
+    ))
+
+    print(f"Despesas: {stats}")
+    print(f"Fluxo de despesas: {ocupacao}")
+    if cache is not None:
+        print(f"Despesas: {cache}")
+
+    return table
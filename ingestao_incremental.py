@@ -0,0 +1,137 @@
+import os
+import json
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from api_camara import BASE_URL, Estatisticas, criar_sessao, coletar_despesas_deputado
+
+DATASET_DIR = "data/despesas"
+WATERMARKS_FILE = os.path.join(DATASET_DIR, "_watermarks.json")
+CHECKPOINT_FILE = os.path.join(DATASET_DIR, "_checkpoint.json")
+
+# Início da 57ª legislatura, usado quando o deputado ainda não tem watermark
+INICIO_PADRAO = (2023, 2)
+
+
+def _ler_json(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _escrever_json(path, data):
+    # Escrita atômica para não corromper o arquivo se a execução cair no meio
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=4)
+    os.replace(tmp, path)
+
+
+def meses_pendentes(watermark, hoje=None):
+    hoje = hoje or datetime.date.today()
+    ano, mes = (watermark["ano"], watermark["mes"]) if watermark else INICIO_PADRAO
+
+    # O mês do watermark é buscado de novo porque pode ter sido ingerido parcialmente
+    meses = {}
+    while (ano, mes) <= (hoje.year, hoje.month):
+        meses.setdefault(ano, []).append(mes)
+        ano, mes = (ano + 1, 1) if mes == 12 else (ano, mes + 1)
+
+    return meses
+
+
+def _caminho_particao(deputado_id, ano, mes, dataset_dir=DATASET_DIR):
+    return os.path.join(dataset_dir, f"deputado_id={deputado_id}", f"ano={ano}", f"mes={mes}")
+
+
+def escrever_particoes(df, deputado_id, dataset_dir=DATASET_DIR):
+    # Cada partição deputado/ano/mes é reescrita por inteiro, o que torna a ingestão idempotente
+    for (ano, mes), particao in df.groupby(["ano", "mes"]):
+        path = _caminho_particao(deputado_id, int(ano), int(mes), dataset_dir)
+        os.makedirs(path, exist_ok=True)
+
+        tmp = os.path.join(path, "_part-0.parquet.tmp")
+        particao.drop(columns=["deputado_id", "ano", "mes"]).to_parquet(tmp, index=False)
+        os.replace(tmp, os.path.join(path, "part-0.parquet"))
+
+
+def ingerir_deputado(session, deputado_id, watermark, base_url=BASE_URL, dataset_dir=DATASET_DIR, stats=None, hoje=None):
+    novo_watermark = watermark
+
+    for ano, meses in meses_pendentes(watermark, hoje).items():
+        params = {"ano": ano, "mes": meses, "itens": 100}
+        linhas = coletar_despesas_deputado(session, deputado_id, base_url, params=params, stats=stats)
+        if not linhas:
+            continue
+
+        df = pd.DataFrame(linhas)
+        escrever_particoes(df, deputado_id, dataset_dir)
+
+        ultimo = df[["ano", "mes"]].astype(int).sort_values(["ano", "mes"]).iloc[-1]
+        novo_watermark = {"ano": int(ultimo["ano"]), "mes": int(ultimo["mes"])}
+
+    return novo_watermark
+
+
+def ingerir_despesas(ids, base_url=BASE_URL, dataset_dir=DATASET_DIR, max_workers=16, hoje=None):
+    hoje = hoje or datetime.date.today()
+    watermarks_file = os.path.join(dataset_dir, os.path.basename(WATERMARKS_FILE))
+    checkpoint_file = os.path.join(dataset_dir, os.path.basename(CHECKPOINT_FILE))
+
+    watermarks = _ler_json(watermarks_file, {})
+
+    # Retoma a execução do dia a partir do checkpoint, pulando os deputados já concluídos
+    checkpoint = _ler_json(checkpoint_file, {})
+    if checkpoint.get("execucao") != hoje.isoformat():
+        checkpoint = {"execucao": hoje.isoformat(), "concluidos": []}
+    concluidos = set(checkpoint["concluidos"])
+
+    pendentes = [id for id in ids if str(id) not in concluidos]
+    print(f"Ingestão incremental: {len(pendentes)} deputados pendentes, {len(concluidos)} retomados do checkpoint")
+
+    session = criar_sessao(max_workers)
+    stats = Estatisticas()
+    lock = threading.Lock()
+
+    def processar(id):
+        watermark = ingerir_deputado(session, id, watermarks.get(str(id)), base_url, dataset_dir, stats, hoje)
+
+        with lock:
+            if watermark:
+                watermarks[str(id)] = watermark
+            concluidos.add(str(id))
+            checkpoint["concluidos"] = sorted(concluidos)
+            _escrever_json(watermarks_file, watermarks)
+            _escrever_json(checkpoint_file, checkpoint)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(processar, id) for id in pendentes]
+        for id, future in zip(pendentes, futures):
+            try:
+                future.result()
+            except Exception as e:
+                stats.registrar(erros=1)
+                print(f"Erro ao processar ID {id}: {e}")
+
+    print(f"Despesas: {stats}")
+
+    # Execução completa sem erros: o checkpoint não é mais necessário
+    if stats.erros == 0 and os.path.exists(checkpoint_file):
+        os.remove(checkpoint_file)
+
+    return watermarks
+
+
+def carregar_despesas(dataset_dir=DATASET_DIR):
+    df = pd.read_parquet(dataset_dir, engine="pyarrow")
+
+    # As colunas de partição voltam como categóricas
+    for col in ["deputado_id", "ano", "mes"]:
+        df[col] = df[col].astype(int)
+
+    return df
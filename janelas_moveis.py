@@ -0,0 +1,133 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from acesso_despesas import gravar_ordenado
+
+SERIE_FILE = "data/serie_despesas_diarias_deputados.parquet"
+JANELAS_FILE = "data/analytics/janelas_despesas.parquet"
+
+JANELAS = [7, 30, 90]
+# Histórico usado no z-score de cada dia: os dias com gasto nos 90 dias anteriores
+HISTORICO_DIAS = 90
+MIN_HISTORICO = 5
+LIMIAR_Z = 3.0
+
+# Linhas com o total do deputado, somando todos os tipos de despesa
+TODOS = "(todos)"
+
+CHAVES = ["deputado_id", "tipoDespesa", "dataDocumento"]
+
+SCHEMA = pa.schema([
+    ("deputado_id", pa.int64()),
+    ("tipoDespesa", pa.string()),
+    ("dataDocumento", pa.date32()),
+    ("valorLiquido", pa.float64()),
+    *[(f"soma_{dias}d", pa.float64()) for dias in JANELAS],
+    ("media_historico", pa.float64()),
+    ("desvio_historico", pa.float64()),
+    ("zscore", pa.float64()),
+    ("pico", pa.bool_()),
+])
+
+
+def _somas_janela(chave, valores, dias):
+    # chave = grupo * 100_000 + dia: janelas de até 90 dias nunca atravessam dois grupos.
+    # Com a soma acumulada, cada janela é a diferença entre o fim e o início encontrado por busca binária
+    acumulado = np.concatenate([[0.0], np.cumsum(valores)])
+    inicio = np.searchsorted(chave, chave - (dias - 1), side="left")
+    return acumulado[np.arange(1, len(chave) + 1)] - acumulado[inicio]
+
+
+def calcular_janelas(diario):
+    # diario: uma linha por deputado, tipo e dia, ordenada por essas chaves
+    if diario.empty:
+        return SCHEMA.empty_table().to_pandas()
+
+    grupo = diario.groupby(["deputado_id", "tipoDespesa"], sort=False).ngroup().to_numpy().astype(np.int64)
+    dia = (pd.to_datetime(diario["dataDocumento"]) - pd.Timestamp("1970-01-01")).dt.days.to_numpy()
+    chave = grupo * 100_000 + dia
+    valores = diario["valorLiquido"].to_numpy(dtype=np.float64)
+
+    saida = diario[CHAVES + ["valorLiquido"]].copy()
+    for dias in JANELAS:
+        saida[f"soma_{dias}d"] = _somas_janela(chave, valores, dias)
+
+    # Z-score de cada dia contra os dias com gasto no histórico anterior (sem incluir o próprio dia)
+    n = _somas_janela(chave, np.ones_like(valores), HISTORICO_DIAS + 1) - 1
+    soma = _somas_janela(chave, valores, HISTORICO_DIAS + 1) - valores
+    soma_quadrados = _somas_janela(chave, valores ** 2, HISTORICO_DIAS + 1) - valores ** 2
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        media = np.where(n > 0, soma / n, np.nan)
+        desvio = np.sqrt(np.clip(soma_quadrados / n - media ** 2, 0, None))
+        zscore = np.where((n >= MIN_HISTORICO) & (desvio > 0), (valores - media) / desvio, np.nan)
+
+    saida["media_historico"] = media
+    saida["desvio_historico"] = desvio
+    saida["zscore"] = zscore
+    saida["pico"] = zscore > LIMIAR_Z
+    return saida
+
+
+def _diario(serie):
+    # Um nível por tipo de despesa e outro com o total do deputado
+    por_tipo = serie.groupby(CHAVES, as_index=False)["valorLiquido"].sum()
+    total = serie.groupby(["deputado_id", "dataDocumento"], as_index=False)["valorLiquido"].sum()
+    total["tipoDespesa"] = TODOS
+    diario = pd.concat([por_tipo, total[CHAVES + ["valorLiquido"]]], ignore_index=True)
+    return diario.sort_values(CHAVES, ignore_index=True)
+
+
+def _primeira_mudanca(diario, anterior):
+    # Compara a entrada atual com os valores guardados na última execução e devolve,
+    # por deputado, a primeira data com dia novo, removido ou alterado
+    comparacao = diario[CHAVES + ["valorLiquido"]].merge(
+        anterior[CHAVES + ["valorLiquido"]], on=CHAVES, how="outer", suffixes=("", "_anterior")
+    )
+    mudou = ~np.isclose(
+        comparacao["valorLiquido"].fillna(np.inf), comparacao["valorLiquido_anterior"].fillna(np.inf)
+    )
+    return comparacao[mudou].groupby("deputado_id")["dataDocumento"].min()
+
+
+def atualizar_janelas(path=SERIE_FILE, destino=JANELAS_FILE):
+    serie = pq.read_table(path, columns=["deputado_id", "tipoDespesa", "dataDocumento", "valorLiquido"]).to_pandas()
+    serie["dataDocumento"] = pd.to_datetime(serie["dataDocumento"])
+    diario = _diario(serie)
+
+    if not os.path.exists(destino):
+        resultado = calcular_janelas(diario)
+        print(f"Janelas móveis: {len(resultado)} linhas calculadas")
+    else:
+        anterior = pq.read_table(destino).to_pandas()
+        anterior["dataDocumento"] = pd.to_datetime(anterior["dataDocumento"])
+        mudancas = _primeira_mudanca(diario, anterior)
+
+        if mudancas.empty:
+            print("Janelas móveis: nenhum dia novo")
+            return anterior
+
+        # Só os dias a partir da primeira mudança de cada deputado são recalculados; o histórico
+        # anterior entra apenas como contexto das janelas
+        inicio = diario["deputado_id"].map(mudancas)
+        contexto = diario[inicio.notna() & (diario["dataDocumento"] >= inicio - pd.Timedelta(days=HISTORICO_DIAS))]
+        recalculado = calcular_janelas(contexto.reset_index(drop=True))
+        recalculado = recalculado[recalculado["dataDocumento"] >= recalculado["deputado_id"].map(mudancas)]
+
+        limite = anterior["deputado_id"].map(mudancas)
+        mantido = anterior[limite.isna() | (anterior["dataDocumento"] < limite)]
+        resultado = pd.concat([mantido, recalculado], ignore_index=True).sort_values(CHAVES, ignore_index=True)
+        print(
+            f"Janelas móveis: {len(mudancas)} deputados com dias novos, "
+            f"{len(recalculado)} de {len(resultado)} linhas recalculadas"
+        )
+
+    os.makedirs(os.path.dirname(destino) or ".", exist_ok=True)
+    tmp = f"{destino}.tmp"
+    gravar_ordenado(pa.Table.from_pandas(resultado, schema=SCHEMA, preserve_index=False), tmp)
+    os.replace(tmp, destino)
+    return resultado
@@ -0,0 +1,38 @@
+import os
+import threading
+
+from cache_llm import ModeloComCache
+
+MODELO_PADRAO = "gemini-1.5-flash"
+
+
+class ModeloLazy:
+    # Só importa e configura o google.generativeai na primeira chamada ao modelo,
+    # para que etapas sem LLM não paguem esse custo nem exijam a GENAI_API_KEY
+    def __init__(self, nome=MODELO_PADRAO):
+        self.nome = nome
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def carregado(self):
+        return self._model is not None
+
+    def _obter(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    import google.generativeai as genai
+
+                    genai.configure(api_key=os.environ["GENAI_API_KEY"])
+                    # Respostas de prompts idênticos são reaproveitadas do cache em disco
+                    self._model = ModeloComCache(genai.GenerativeModel(self.nome))
+        return self._model
+
+    def generate_content(self, prompt, generation_config=None, **kwargs):
+        return self._obter().generate_content(prompt, generation_config=generation_config, **kwargs)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._obter(), name)
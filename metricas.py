@@ -0,0 +1,260 @@
+import os
+import re
+import json
+import time
+import datetime
+import threading
+
+METRICAS_DIR = "data/.cache/metricas"
+
+# Limites (em segundos) dos buckets de latência, no formato cumulativo do Prometheus
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+BUCKETS_TAMANHO = (100, 500, 1_000, 5_000, 10_000, 50_000, 100_000, 500_000)
+
+DESCRICOES = {
+    "pipeline_etapa_duracao_segundos": "Tempo de parede de cada etapa do pipeline",
+    "pipeline_etapa_rss_pico_bytes": "Pico de RSS do processo durante a etapa",
+    "pipeline_etapas_total": "Etapas por status na execução",
+    "pipeline_artefato_linhas": "Linhas gravadas em cada artefato",
+    "http_latencia_segundos": "Latência das requisições à API da Câmara por endpoint",
+    "http_respostas_total": "Respostas da API por endpoint e status",
+    "http_retries_total": "Novas tentativas de requisição por endpoint",
+    "llm_latencia_segundos": "Latência das chamadas ao modelo",
+    "llm_prompt_caracteres": "Tamanho dos prompts enviados ao modelo",
+    "llm_prompt_tokens_estimados": "Tokens estimados de cada prompt, por template",
+    "llm_resposta_caracteres": "Tamanho das respostas do modelo",
+    "llm_chamadas_total": "Chamadas ao modelo por resultado (ok, cache, erro, erro_temporario)",
+    "llm_retries_total": "Novas tentativas de chamadas ao modelo",
+}
+
+_NUMERICO = re.compile(r"/\d+(?=/|$)")
+
+
+def endpoint(url):
+    # Ids numéricos viram um marcador para que /deputados/123/despesas e /deputados/456/despesas
+    # caiam na mesma série
+    caminho = url.split("://", 1)[-1].split("?", 1)[0]
+    caminho = "/" + caminho.split("/", 1)[1] if "/" in caminho else "/"
+    return _NUMERICO.sub("/{id}", caminho)
+
+
+def rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+
+        # Fora do Linux: ru_maxrss é o pico do processo, o melhor disponível
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class MonitorRSS:
+    # Amostra o RSS em uma thread enquanto o bloco roda; como as etapas compartilham o processo,
+    # o pico inclui a memória de etapas executadas em paralelo
+    def __init__(self, intervalo=0.05):
+        self.intervalo = intervalo
+        self.pico = 0
+        self._rodando = threading.Event()
+
+    def _amostrar(self):
+        while self._rodando.is_set():
+            self.pico = max(self.pico, rss_bytes())
+            time.sleep(self.intervalo)
+
+    def __enter__(self):
+        self.pico = rss_bytes()
+        self._rodando.set()
+        self._thread = threading.Thread(target=self._amostrar, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._rodando.clear()
+        self._thread.join()
+        self.pico = max(self.pico, rss_bytes())
+        return False
+
+
+class Histograma:
+    def __init__(self, limites):
+        self.limites = limites
+        self.contagens = [0] * (len(limites) + 1)
+        self.soma = 0.0
+        self.contagem = 0
+
+    def observar(self, valor):
+        i = 0
+        while i < len(self.limites) and valor > self.limites[i]:
+            i += 1
+        self.contagens[i] += 1
+        self.soma += valor
+        self.contagem += 1
+
+    def quantil(self, q):
+        # Interpolação linear dentro do bucket, como o histogram_quantile do Prometheus
+        if self.contagem == 0:
+            return None
+        alvo = q * self.contagem
+        acumulado = 0
+        for i, n in enumerate(self.contagens):
+            if acumulado + n >= alvo and n:
+                if i == len(self.limites):
+                    return self.limites[-1]
+                inferior = self.limites[i - 1] if i else 0.0
+                return inferior + (self.limites[i] - inferior) * (alvo - acumulado) / n
+            acumulado += n
+        return self.limites[-1]
+
+    def resumo(self):
+        return {
+            "contagem": self.contagem,
+            "soma": round(self.soma, 6),
+            "media": round(self.soma / self.contagem, 6) if self.contagem else None,
+            "p50": self.quantil(0.5),
+            "p95": self.quantil(0.95),
+            "p99": self.quantil(0.99),
+        }
+
+
+class Metricas:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.inicio = time.time()
+        self.contadores = {}
+        self.gauges = {}
+        self.histogramas = {}
+
+    @staticmethod
+    def _chave(nome, labels):
+        return nome, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def incrementar(self, nome, valor=1, **labels):
+        chave = self._chave(nome, labels)
+        with self.lock:
+            self.contadores[chave] = self.contadores.get(chave, 0) + valor
+
+    def definir(self, nome, valor, **labels):
+        with self.lock:
+            self.gauges[self._chave(nome, labels)] = valor
+
+    def observar(self, nome, valor, limites=BUCKETS_LATENCIA, **labels):
+        chave = self._chave(nome, labels)
+        with self.lock:
+            if chave not in self.histogramas:
+                self.histogramas[chave] = Histograma(limites)
+            self.histogramas[chave].observar(valor)
+
+    def relatorio(self):
+        def agrupar(series, valor):
+            saida = {}
+            for (nome, labels), serie in sorted(series.items()):
+                saida.setdefault(nome, []).append({"labels": dict(labels), **valor(serie)})
+            return saida
+
+        with self.lock:
+            return {
+                "inicio": datetime.datetime.fromtimestamp(self.inicio).isoformat(timespec="seconds"),
+                "duracao_s": round(time.time() - self.inicio, 3),
+                "contadores": agrupar(self.contadores, lambda v: {"valor": v}),
+                "gauges": agrupar(self.gauges, lambda v: {"valor": v}),
+                "histogramas": agrupar(self.histogramas, Histograma.resumo),
+            }
+
+    def prometheus(self):
+        def formatar(nome, labels, extra=()):
+            pares = list(labels) + list(extra)
+            if not pares:
+                return nome
+            return nome + "{" + ",".join(f'{k}="{v}"' for k, v in pares) + "}"
+
+        linhas = []
+        with self.lock:
+            for tipo, series in (("counter", self.contadores), ("gauge", self.gauges), ("histogram", self.histogramas)):
+                nomes = sorted({nome for nome, _ in series})
+                for nome in nomes:
+                    linhas.append(f"# HELP {nome} {DESCRICOES.get(nome, nome)}")
+                    linhas.append(f"# TYPE {nome} {tipo}")
+                    for (n, labels), serie in sorted(series.items()):
+                        if n != nome:
+                            continue
+                        if tipo != "histogram":
+                            linhas.append(f"{formatar(nome, labels)} {serie}")
+                            continue
+                        acumulado = 0
+                        for limite, contagem in zip(list(serie.limites) + ["+Inf"], serie.contagens):
+                            acumulado += contagem
+                            linhas.append(f"{formatar(nome + '_bucket', labels, [('le', limite)])} {acumulado}")
+                        linhas.append(f"{formatar(nome + '_sum', labels)} {serie.soma}")
+                        linhas.append(f"{formatar(nome + '_count', labels)} {serie.contagem}")
+        return "\n".join(linhas) + "\n"
+
+    def gravar(self, diretorio=METRICAS_DIR):
+        # Relatório JSON da execução e arquivo texto no formato do textfile collector do Prometheus
+        os.makedirs(diretorio, exist_ok=True)
+        saidas = {
+            os.path.join(diretorio, "execucao.json"): json.dumps(self.relatorio(), ensure_ascii=False, indent=4),
+            os.path.join(diretorio, "metricas.prom"): self.prometheus(),
+        }
+        for path, conteudo in saidas.items():
+            tmp = f"{path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(conteudo)
+            os.replace(tmp, path)
+        return list(saidas)
+
+
+# Registro único do processo, alimentado pelo cliente HTTP, pelo executor de LLM e pelo pipeline
+metricas = Metricas()
+
+
+def contar_linhas(path):
+    # Linhas de cada artefato sem carregar o conteúdo inteiro quando o formato permite
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        return pq.ParquetFile(path).metadata.num_rows
+    if path.endswith(".csv"):
+        with open(path, "rb") as f:
+            return max(sum(1 for _ in f) - 1, 0)
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            return len(json.load(f))
+    return None
+
+
+class Perfil:
+    # Perfil opcional de uma etapa com cProfile (.prof, abrir com snakeviz/pstats) ou pyinstrument (.html);
+    # ambos só enxergam a thread da etapa, não os pools que ela cria
+    def __init__(self, tipo, path_base):
+        self.tipo = tipo
+        self.path_base = path_base
+        self.path = None
+
+    def __enter__(self):
+        if self.tipo == "cprofile":
+            import cProfile
+
+            self._perfil = cProfile.Profile()
+            self._perfil.enable()
+        elif self.tipo == "pyinstrument":
+            from pyinstrument import Profiler
+
+            self._perfil = Profiler()
+            self._perfil.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self.tipo is None:
+            return False
+        os.makedirs(os.path.dirname(self.path_base) or ".", exist_ok=True)
+        if self.tipo == "cprofile":
+            self._perfil.disable()
+            self.path = f"{self.path_base}.prof"
+            self._perfil.dump_stats(self.path)
+        elif self.tipo == "pyinstrument":
+            self._perfil.stop()
+            self.path = f"{self.path_base}.html"
+            with open(self.path, "w", encoding="utf-8") as f:
+                f.write(self._perfil.output_html())
+        return False
@@ -0,0 +1,365 @@
+import os
+import sys
+import json
+import time
+import runpy
+import hashlib
+import argparse
+import importlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from cache_http import MODOS as MODOS_CACHE
+from metricas import METRICAS_DIR, MonitorRSS, Perfil, contar_linhas, metricas
+
+# Mesmos nomes de analytics.TABELAS, repetidos aqui para não importar pandas ao montar o DAG
+TABELAS_ANALYTICS = ["despesas_deputado_tipo", "despesas_deputado", "despesas_tipo", "maiores_gastos"]
+
+ESTADO_FILE = "data/.cache/pipeline.json"
+PERFIS_DIR = "data/.cache/perfis"
+
+
+class Etapa:
+    def __init__(self, nome, funcao, entradas=(), saidas=(), externa=False, opcoes=(), gerada=False):
+        self.nome = nome
+        # "modulo:funcao" ou "script:caminho.py", resolvido apenas na execução
+        self.funcao = funcao
+        self.entradas = list(entradas)
+        self.saidas = list(saidas)
+        # Etapas externas dependem da API e sempre são executadas
+        self.externa = externa
+        # Opções da linha de comando repassadas à função da etapa como argumentos nomeados
+        self.opcoes = list(opcoes)
+        # Etapas que executam código escrito pelo LLM só rodam com --executar-gerados
+        self.gerada = gerada
+
+    def executar(self, opcoes=None):
+        tipo, alvo = self.funcao.split(":", 1)
+        if tipo == "script":
+            runpy.run_path(alvo, run_name="__main__")
+        else:
+            kwargs = {}
+            for nome in self.opcoes:
+                valor = (opcoes or {}).get(nome)
+                # Opções definidas por etapa chegam como {etapa: valor}, com "*" valendo para as demais
+                if isinstance(valor, dict):
+                    valor = valor.get(self.nome, valor.get("*"))
+                if valor is not None:
+                    kwargs[nome] = valor
+            getattr(importlib.import_module(tipo), alvo)(**kwargs)
+
+
+ETAPAS = [
+    # Ramo deputados/distribuição
+    Etapa("deputados", "dataprep:questao3", saidas=["data/deputados.parquet"], externa=True, opcoes=["cache_modo"]),
+    # Etapas que chamam o LLM têm prompts.py como entrada: mudar um prompt invalida a saída
+    Etapa("questao3b", "dataprep:questao3b", entradas=["prompts.py"], saidas=["questoes/questao3b.py"]),
+    # O script gerado só foi validado com ast.parse: roda no processo do pipeline, com suas credenciais,
+    # então fica fora da execução padrão até alguém revisá-lo
+    Etapa(
+        "grafico_distribuicao",
+        "script:questoes/questao3b.py",
+        entradas=["data/deputados.parquet", "questoes/questao3b.py"],
+        saidas=["docs/distribuicao_deputados.png"],
+        gerada=True,
+    ),
+    Etapa(
+        "distribuicao",
+        "script:questoes/questao3c.py",
+        entradas=["data/deputados.parquet", "questoes/questao3c.py"],
+        saidas=["data/distribuicao_deputados.csv"],
+    ),
+    Etapa(
+        "insights_distribuicao",
+        "dataprep:questao3c",
+        entradas=["data/distribuicao_deputados.csv", "prompts.py"],
+        saidas=["data/insights_distribuicao_deputados.json"],
+    ),
+    # Ramo despesas
+    Etapa(
+        "despesas",
+        "dataprep:questao4_despesas",
+        entradas=["data/deputados.parquet"],
+        saidas=["data/serie_despesas_diarias_deputados.parquet"],
+        externa=True,
+        opcoes=["incremental", "processos", "cache_modo"],
+    ),
+    Etapa("questao4b", "dataprep:questao4b", entradas=["prompts.py"], saidas=["questoes/questao4b.py"]),
+    Etapa(
+        "analytics",
+        "analytics:gerar_tabelas",
+        entradas=["data/serie_despesas_diarias_deputados.parquet"],
+        saidas=[f"data/analytics/{nome}.parquet" for nome in TABELAS_ANALYTICS],
+    ),
+    Etapa(
+        "janelas",
+        "janelas_moveis:atualizar_janelas",
+        entradas=["data/serie_despesas_diarias_deputados.parquet"],
+        saidas=["data/analytics/janelas_despesas.parquet"],
+    ),
+    Etapa(
+        "insights_despesas",
+        "dataprep:questao4c",
+        entradas=["data/analytics/maiores_gastos.parquet", "data/analytics/despesas_deputado.parquet", "prompts.py"],
+        saidas=["data/insights_despesas_deputados.json"],
+    ),
+    # Ramo proposições
+    Etapa(
+        "proposicoes",
+        "dataprep:questao_5a",
+        saidas=["data/proposicoes_deputados.parquet", "data/proposicoes_deputados.busca.npz"],
+        externa=True,
+        opcoes=["cache_modo"],
+    ),
+    Etapa(
+        "sumarizacao",
+        "dataprep:questao_5b",
+        # Os prompts de map e reduce ficam no próprio módulo de sumarização
+        entradas=["data/proposicoes_deputados.parquet", "sumarizacao.py"],
+        saidas=["data/sumarizacao_proposicoes.json", "data/clusters_proposicoes.json"],
+    ),
+    # Snapshots Arrow mapeados em memória pelos dashboards
+    Etapa(
+        "snapshots",
+        "snapshots:publicar_snapshots",
+        entradas=[
+            "data/deputados.parquet",
+            "data/serie_despesas_diarias_deputados.parquet",
+            "data/proposicoes_deputados.parquet",
+        ],
+        saidas=["data/deputados.arrow", "data/serie_despesas_diarias_deputados.arrow", "data/proposicoes_deputados.arrow"],
+    ),
+    # Dashboards gerados
+    # Código dos dashboards gerado pelo LLM em questoes/, sem tocar nos dashboards mantidos no repositório
+    Etapa("dashboard_chain", "dataprep:questao6_dashboard", entradas=["prompts.py"], saidas=["questoes/dashboard_chain.py"]),
+    Etapa("dashboard_batch", "dataprep:questao7", entradas=["prompts.py"], saidas=["questoes/dashboard_batch.py"]),
+]
+
+
+def hash_arquivos(paths):
+    h = hashlib.sha256()
+    for path in paths:
+        h.update(path.encode("utf-8"))
+        if not os.path.exists(path):
+            h.update(b"<ausente>")
+            continue
+        with open(path, "rb") as f:
+            for bloco in iter(lambda: f.read(1 << 20), b""):
+                h.update(bloco)
+    return h.hexdigest()
+
+
+def _ler_estado(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _gravar_estado(path, estado):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(estado, f, indent=4)
+    os.replace(tmp, path)
+
+
+def dependencias(etapas):
+    produtor = {saida: etapa.nome for etapa in etapas for saida in etapa.saidas}
+    return {
+        etapa.nome: {produtor[entrada] for entrada in etapa.entradas if entrada in produtor}
+        for etapa in etapas
+    }
+
+
+def selecionar(etapas, only=None, from_=None, gerados=False):
+    nomes = [etapa.nome for etapa in etapas]
+    desconhecidas = set(only or []) | ({from_} if from_ else set())
+    desconhecidas -= set(nomes)
+    if desconhecidas:
+        raise ValueError(f"Etapas desconhecidas: {sorted(desconhecidas)}. Disponíveis: {nomes}")
+
+    bloqueadas = {etapa.nome for etapa in etapas if etapa.gerada and not gerados}
+    if bloqueadas & (set(only or []) | ({from_} if from_ else set())):
+        raise ValueError(f"As etapas {sorted(bloqueadas)} executam código gerado pelo LLM; use --executar-gerados")
+
+    selecionadas = set(nomes)
+
+    # --from: a etapa indicada e todas as que dependem dela, direta ou indiretamente
+    if from_:
+        deps = dependencias(etapas)
+        selecionadas = {from_}
+        mudou = True
+        while mudou:
+            novas = {nome for nome, d in deps.items() if d & selecionadas} - selecionadas
+            selecionadas |= novas
+            mudou = bool(novas)
+
+    if only:
+        selecionadas &= set(only)
+
+    selecionadas -= bloqueadas
+
+    return [etapa for etapa in etapas if etapa.nome in selecionadas]
+
+
+def executar(etapas, selecionadas=None, force=False, max_workers=4, estado_file=ESTADO_FILE, perfil=None, opcoes=None):
+    selecionadas = selecionadas if selecionadas is not None else etapas
+    if perfil and max_workers > 1:
+        # Só um profiler pode estar ativo por processo (ValueError no 3.12+, perfis misturados antes):
+        # com --profile as etapas rodam uma de cada vez
+        print(f"--profile: executando as etapas em série (em vez de {max_workers} em paralelo)")
+        max_workers = 1
+    nomes = {etapa.nome for etapa in selecionadas}
+    por_nome = {etapa.nome: etapa for etapa in selecionadas}
+
+    # Dependências fora da seleção são consideradas já satisfeitas
+    deps = {nome: d & nomes for nome, d in dependencias(etapas).items() if nome in nomes}
+
+    estado = _ler_estado(estado_file)
+    lock = threading.Lock()
+    relatorio = {}
+
+    def rodar(etapa):
+        hash_entradas = hash_arquivos(etapa.entradas)
+        anterior = estado.get(etapa.nome, {})
+
+        pular = (
+            not force
+            and not etapa.externa
+            and anterior.get("entradas") == hash_entradas
+            and anterior.get("saidas") == hash_arquivos(etapa.saidas)
+            and all(os.path.exists(saida) for saida in etapa.saidas)
+        )
+        if pular:
+            return "pulada", 0.0, 0
+
+        inicio = time.perf_counter()
+        with MonitorRSS() as rss, Perfil(perfil, os.path.join(PERFIS_DIR, etapa.nome)) as perfil_etapa:
+            etapa.executar(opcoes)
+        duracao = time.perf_counter() - inicio
+
+        metricas.definir("pipeline_etapa_duracao_segundos", round(duracao, 3), etapa=etapa.nome)
+        metricas.definir("pipeline_etapa_rss_pico_bytes", rss.pico, etapa=etapa.nome)
+        for saida in etapa.saidas:
+            linhas = contar_linhas(saida) if os.path.exists(saida) else None
+            if linhas is not None:
+                metricas.definir("pipeline_artefato_linhas", linhas, artefato=saida)
+        if perfil_etapa.path:
+            print(f"Perfil da etapa {etapa.nome}: {perfil_etapa.path}")
+
+        with lock:
+            estado[etapa.nome] = {"entradas": hash_entradas, "saidas": hash_arquivos(etapa.saidas)}
+            _gravar_estado(estado_file, estado)
+
+        return "executada", duracao, rss.pico
+
+    # Gráficos gerados em threads não podem usar um backend interativo
+    os.environ.setdefault("MPLBACKEND", "Agg")
+
+    inicio = time.perf_counter()
+    pendentes = set(nomes)
+    concluidas = set()
+    em_execucao = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pendentes or em_execucao:
+            for nome in sorted(pendentes):
+                if deps[nome] <= concluidas:
+                    pendentes.discard(nome)
+                    em_execucao[executor.submit(rodar, por_nome[nome])] = nome
+                elif any(relatorio.get(d, ("",))[0] in ("erro", "cancelada") for d in deps[nome]):
+                    pendentes.discard(nome)
+                    relatorio[nome] = ("cancelada", 0.0, 0)
+
+            if not em_execucao:
+                continue
+
+            feitas, _ = wait(em_execucao, return_when=FIRST_COMPLETED)
+            for future in feitas:
+                nome = em_execucao.pop(future)
+                try:
+                    relatorio[nome] = future.result()
+                    concluidas.add(nome)
+                except Exception as e:
+                    print(f"Erro na etapa {nome}: {e}")
+                    relatorio[nome] = ("erro", 0.0, 0)
+
+    total = time.perf_counter() - inicio
+    for status, _, _ in relatorio.values():
+        metricas.incrementar("pipeline_etapas_total", status=status)
+    imprimir_relatorio(selecionadas, relatorio, total)
+
+    return relatorio
+
+
+def modos_cache(texto):
+    # "refresh" vale para todas as etapas; "deputados=cache,despesas=refresh" define o modo por etapa
+    modos = {}
+    for parte in texto.split(","):
+        etapa, _, modo = parte.rpartition("=")
+        if modo not in MODOS_CACHE:
+            raise argparse.ArgumentTypeError(f"modo de cache inválido: {modo}. Use um de {MODOS_CACHE}")
+        modos[etapa or "*"] = modo
+    return modos
+
+
+def imprimir_relatorio(etapas, relatorio, total):
+    largura = max([len("Etapa")] + [len(etapa.nome) for etapa in etapas])
+    print(f"\n{'Etapa'.ljust(largura)} | {'Status'.ljust(10)} | Tempo (s) | Pico RSS (MB)")
+    print("-" * (largura + 42))
+    for etapa in etapas:
+        status, duracao, rss = relatorio.get(etapa.nome, ("-", 0.0, 0))
+        print(f"{etapa.nome.ljust(largura)} | {status.ljust(10)} | {duracao:9.2f} | {rss / 2**20:13.1f}")
+    print("-" * (largura + 42))
+    print(f"{'Total'.ljust(largura)} | {''.ljust(10)} | {total:9.2f} |")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Executa o pipeline de dados da Câmara dos Deputados")
+    parser.add_argument("--only", help="Executa apenas as etapas indicadas, separadas por vírgula")
+    parser.add_argument("--from", dest="from_", help="Executa a etapa indicada e todas as que dependem dela")
+    parser.add_argument("--force", action="store_true", help="Executa mesmo que as entradas não tenham mudado")
+    parser.add_argument("--workers", type=int, default=4, help="Número de etapas executadas em paralelo")
+    parser.add_argument("--incremental", action="store_true", help="Ingestão incremental das despesas")
+    parser.add_argument("--processos", type=int, default=1, help="Processos da agregação da série diária")
+    parser.add_argument(
+        "--cache-modo", type=modos_cache, default={}, help="Modo do cache HTTP, geral ou por etapa (deputados=cache,despesas=refresh)"
+    )
+    parser.add_argument(
+        "--executar-gerados", action="store_true", help="Inclui as etapas que executam scripts gerados pelo LLM (revise-os antes)"
+    )
+    parser.add_argument("--list", action="store_true", help="Lista as etapas e suas dependências")
+    parser.add_argument(
+        "--profile", choices=["cprofile", "pyinstrument"], help=f"Grava um perfil de cada etapa em {PERFIS_DIR} (etapas em série)"
+    )
+    parser.add_argument("--metricas", default=METRICAS_DIR, help="Diretório do relatório JSON e do arquivo do Prometheus")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        geradas = {etapa.nome for etapa in ETAPAS if etapa.gerada}
+        for nome, deps in dependencias(ETAPAS).items():
+            marca = " (só com --executar-gerados)" if nome in geradas else ""
+            print(f"{nome}: {', '.join(sorted(deps)) or '-'}{marca}")
+        return
+
+    only = args.only.split(",") if args.only else None
+    selecionadas = selecionar(ETAPAS, only=only, from_=args.from_, gerados=args.executar_gerados)
+    opcoes = {"incremental": args.incremental, "processos": args.processos, "cache_modo": args.cache_modo}
+    relatorio = executar(
+        ETAPAS, selecionadas, force=args.force, max_workers=args.workers, perfil=args.profile, opcoes=opcoes
+    )
+
+    # O cache de LLM só existe se alguma etapa chamou o modelo
+    dataprep = sys.modules.get("dataprep")
+    if dataprep is not None and dataprep.model.carregado:
+        print(dataprep.model.cache)
+
+    print(f"Métricas: {', '.join(metricas.gravar(args.metricas))}")
+
+    if any(status == "erro" for status, _, _ in relatorio.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
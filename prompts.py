@@ -0,0 +1,339 @@
+import string
+import hashlib
+import textwrap
+
+import numpy as np
+import pandas as pd
+
+from executor_llm import estimar_tokens
+from metricas import metricas, BUCKETS_TAMANHO
+
+# Orçamento padrão para tabelas embutidas em prompts
+MAX_TOKENS_TABELA = 1000
+
+
+class Template:
+    # O texto é normalizado e seus campos extraídos uma única vez, na importação do módulo.
+    # Instruções fixas vêm antes dos dados, o que mantém um prefixo estável entre chamadas
+    def __init__(self, nome, versao, texto):
+        self.nome = nome
+        self.versao = versao
+        self.texto = textwrap.dedent(texto).strip()
+        self.campos = {campo for _, campo, _, _ in string.Formatter().parse(self.texto) if campo}
+        self.hash = hashlib.sha256(self.texto.encode("utf-8")).hexdigest()[:12]
+        self.tokens_fixos = estimar_tokens(self.texto)
+
+    @property
+    def id(self):
+        return f"{self.nome}@{self.versao}"
+
+    def formatar(self, **valores):
+        faltando = self.campos - set(valores)
+        if faltando:
+            raise KeyError(f"Campos ausentes no template {self.id}: {sorted(faltando)}")
+
+        prompt = self.texto.format(**valores) if self.campos else self.texto
+        metricas.observar("llm_prompt_tokens_estimados", estimar_tokens(prompt), limites=BUCKETS_TAMANHO, template=self.id)
+        return prompt
+
+
+def renderizar_tabela(df, formatos=None, separador=" | ", cabecalho=True):
+    # Formatação coluna a coluna e concatenação vetorizada, sem iterar pelas linhas
+    formatos = formatos or {}
+    colunas = [
+        pd.Series(np.char.mod(formatos[col], df[col].to_numpy()), index=df.index) if col in formatos
+        else df[col].astype(str)
+        for col in df.columns
+    ]
+    if not colunas:
+        return ""
+
+    linhas = colunas[0].str.cat(colunas[1:], sep=separador) if len(colunas) > 1 else colunas[0]
+    texto = "\n".join(linhas.tolist())
+    if cabecalho:
+        texto = separador.join(map(str, df.columns)) + ("\n" + texto if texto else "")
+    return texto
+
+
+def resumo_estatistico(df):
+    # Último recurso: só as estatísticas das colunas numéricas, de tamanho fixo
+    resumo = df.describe().T.round(2).reset_index(names="coluna")
+    return f"{len(df)} linhas; estatísticas por coluna:\n" + renderizar_tabela(resumo)
+
+
+def compactar_tabela(df, ordenar_por, rotulo, max_tokens=MAX_TOKENS_TABELA, formatos=None, agregacoes=None, k_min=3):
+    texto = renderizar_tabela(df, formatos)
+    tokens = estimar_tokens(texto)
+    if tokens <= max_tokens:
+        return texto
+
+    # Top-k pelo valor e uma linha "Outros" com o restante; k parte do tamanho médio de cada linha
+    # e diminui até a tabela caber no orçamento
+    ordenado = df.sort_values(ordenar_por, ascending=False)
+    agregacoes = agregacoes or {}
+    k = int(max_tokens / (tokens / max(len(df), 1)))
+
+    while k >= k_min:
+        topo, resto = ordenado.iloc[:k], ordenado.iloc[k:]
+        outros = {
+            col: round(resto[col].agg(agregacoes.get(col, "sum")), 2) if pd.api.types.is_numeric_dtype(resto[col]) else ""
+            for col in df.columns
+        }
+        outros[rotulo] = f"Outros ({len(resto)})"
+
+        texto = renderizar_tabela(pd.concat([topo, pd.DataFrame([outros])], ignore_index=True), formatos)
+        tokens = estimar_tokens(texto)
+        if tokens <= max_tokens:
+            return texto
+        k = min(k - 1, int(k * max_tokens / tokens))
+
+    return resumo_estatistico(df)
+
+
+# Ao alterar o texto de um template, incremente a versão: ela identifica o prompt nas métricas
+GRAFICO_DISTRIBUICAO = Template(
+    "grafico_distribuicao",
+    "v1",
+    """
+Retorne apenas um script em Python utilizando as bibliotecas matplotlib e pandas que gere um gráfico de pizza representando o número total e o percentual
+de deputados de cada partido a partir do conjunto de dados data/deputados.parquet. Considere que os dados serão lidos com o pandas, a coluna siglaPartido
+contem o nome dos partidos. O gráfico de pizza deve conter:
+1.	Os rótulos mostrando o nome do partido.
+2.	A quantidade e o percentual de deputados de cada partido no formato: 'Partido: Qtd (%Perc)'.
+3.	Um título para o gráfico.
+Após criar o código do gráfico, salve-o no arquivo docs/distribuicao_deputados.png com alta qualidade.
+Garanta que o código seja bem estruturado e utilize boas práticas, como comentários explicativos.
+""",
+)
+
+
+INSIGHTS_DISTRIBUICAO = Template(
+    "insights_distribuicao",
+    "v1",
+    """
+Você é um analista político especializado em ciência política e sociologia legislativa. Sua tarefa é analisar dados fornecidos sobre a distribuição de
+deputados por partido na Câmara dos Deputados. Use insights qualitativos e quantitativos para responder às questões propostas.
+
+Os dados estão formatados da seguinte forma:
+{tabela}
+
+Aqui estão exemplos de como estruturar suas respostas:
+- Identifique tendências de coalizões com base nos partidos majoritários.
+- Compare a proporção de deputados entre partidos ideologicamente alinhados e discuta a formação de blocos.
+- Analise como a presença de partidos menores pode influenciar decisões estratégicas, considerando sua porcentagem.
+
+Agora, com base nos dados fornecidos, responda:
+1. Quais partidos têm maior probabilidade de liderar coalizões e como isso pode afetar a aprovação de propostas legislativas?
+2. Como a proporção de deputados de partidos menores pode influenciar o equilíbrio de poder?
+3. Quais dinâmicas parlamentares podem surgir entre partidos ideologicamente opostos?
+
+Sua análise deve ser objetiva, detalhada e incluir projeções sobre o impacto legislativo da configuração atual.
+""",
+)
+
+
+CODIGO_ANALISE_DESPESAS = Template(
+    "codigo_analise_despesas",
+    "v1",
+    """
+Você é um modelo de linguagem especializado em análise de dados.
+Vou te solicitar uma análise em etapas.
+Os dados sobre despesas de deputados estão em 'data/serie_despesas_diarias_deputados.parquet.
+Aqui estão as colunas disponíveis:
+
+- dataDocumento: Data do documento da despesa.
+- deputado_id: Identificação do deputado.
+- tipoDespesa: Tipo de despesa realizada.
+- valorDocumento: Valor total do documento.
+- valorLiquido: Valor líquido da despesa.
+
+Siga as instruções abaixo para realizar a análise:
+
+### Etapa 1: Preparação dos dados
+Escreva um código Python que carregue os dados parquet e realize o pré-processamento necessário. Isso inclui:
+- Converter a coluna `dataDocumento` para o formato de data.
+- Garantir que valores financeiros sejam interpretados como numéricos.
+- Tratar valores ausentes, se necessário.
+
+Depois de processar os dados, exiba as primeiras 5 linhas como exemplo.
+
+### Etapa 2: Análise dos maiores gastos
+Com os dados preparados, identifique:
+1. Os três deputados com os maiores valores líquidos totais de despesa, separados por tipo de despesa.
+2. Para cada deputado, exiba o tipo de despesa mais frequente.
+
+### Etapa 3: Análise das despesas médias
+Calcule:
+1. A média de despesas líquidas por deputado, considerando o período total.
+2. O tipo de despesa com a maior média de gastos líquidos.
+
+### Etapa 4: Proporção de gastos por tipo
+Analise:
+1. A proporção do valor líquido total de cada tipo de despesa em relação ao total geral de despesas líquidas.
+2. Identifique os três tipos de despesas que representam a maior proporção do valor líquido total.
+
+### Finalização
+Inclua comentários explicativos em cada etapa do código gerado.
+Retorne apenas o código Python, sem a necessidade de executá-lo.
+""",
+)
+
+
+INSIGHTS_DESPESAS = Template(
+    "insights_despesas",
+    "v1",
+    """
+Explique e responda cada pergunta
+
+1. Qual é a categoria de maior gasto entre os deputados analisados?
+Conhecimento: O maior gasto identificado foi na categoria '{categoria}' com um valor total de R$ {valor_categoria:.2f}, conforme os dados analisados.
+
+2. Qual é o deputado que apresenta a maior média de gastos líquidos?
+Conhecimento: O deputado com a maior média de gastos líquidos é o de ID {deputado_id}, com uma média de R$ {media:.2f}, conforme os dados analisados.
+
+3. Qual é o tipo de despesa mais frequente associado aos deputados?
+Conhecimento: O tipo de despesa mais frequente é '{tipo}', que aparece {frequencia} vezes nos dados analisados.
+
+Retorne apenas o resultado em formato JSON
+""",
+)
+
+
+DASHBOARD_CHAIN = Template(
+    "dashboard_chain",
+    "v3",
+    """
+Pergunta: Me retorne apenas o trecho de código Python para gerar duas abas no Streamlit com o nome 'Bem-vindos' e 'Sobre',
+com o titulo 'Olá, bem vindo' na aba 'Bem-vindos' e a descrição "Essa é a nossa página principal".
+Resposta:
+
+tab1, tab2 = st.tabs(["Bem-vindos", "Sobre"])
+
+with tab1:
+    st.header("Olá, bem vindo")
+    st.subheader("Essa é a nossa página principal")
+
+with tab2:
+    st.header("Sobre")
+
+Pergunta: Me retorne apenas o trecho de código Python para adicionar a aba com o nome 'Bem-vindos' uma imagem chamada 'bem_vindos.png'.
+Resposta:
+
+(tab1,) = st.tabs(["Bem-vindos"])
+
+with tab1:
+    st.image("bem_vindos.png")
+
+Pergunta: Me retorne apenas o trecho de código Python para adicionar a aba com o nome 'Bem-vindos' e carregar um json chamado 'data/teste.json' com a key 'asjdhds' e exibi-lo no Streamlit.
+Resposta:
+
+(tab1,) = st.tabs(["Bem-vindos"])
+
+with tab1:
+    json_file = "data/teste.json"
+    key = "asjdhds"
+
+    with open(json_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+        st.write(data[key])
+
+Pergunta: Me retorne apenas o trecho de código Python para adicionar a aba com o nome 'Bem-vindos' e ler um arquivo YAML chamado 'teste.yaml' e retornar a chave 'testando' do arquivo.
+Resposta:
+
+(tab1,) = st.tabs(["Bem-vindos"])
+
+with tab1:
+    yaml_file = "teste.yaml"
+    key = "testando"
+
+    with open(yaml_file, "r") as file:
+        config = yaml.safe_load(file)
+        st.write(config[key])
+
+Pergunta: Me retorne apenas o trecho de código Python para gerar três abas no Streamlit com o nome 'Overview', 'Despesas' e 'Proposições',
+com o titulo 'Overview', descrição "Bem vindos ao Dashboard", uma imagem chamada 'docs/distribuicao_deputados.png', carregar um json chamado 'data/insights_distribuicao_deputados.json'
+com a key 'response' e exibi-lo no Streamlit e ler um arquivo YAML chamado 'data/config.yaml' e retornar a chave 'chave' do arquivo. na aba 'Overview'?
+Os arquivos devem ser lidos com as funções do módulo dados_dashboard, que guardam a leitura em cache e já exibem o erro com st.error, retornando None:
+- carregar_json('data/insights_distribuicao_deputados.json', CAMPOS_INSIGHTS_DISTRIBUICAO)
+- carregar_yaml('data/config.yaml', ['chave'])
+Só exiba cada valor se o retorno não for None, sem interromper as demais abas. As abas 'Despesas' e 'Proposições' devem conter apenas o cabeçalho.
+Resposta:
+""",
+)
+
+
+DASHBOARD_CARREGAR_DADOS = Template(
+    "dashboard_carregar_dados",
+    "v3",
+    """
+Escreva apenas o código Python para carregar os dados de um dashboard Streamlit, usando as funções do módulo dados_dashboard:
+- carregar_json(path, obrigatorias) e carregar_parquet(path, obrigatorias) leem o arquivo uma única vez por versão, com st.cache_resource,
+e validam os campos obrigatórios; em caso de erro exibem a mensagem com st.error e retornam None.
+- carregar_snapshot(path, obrigatorias) retorna uma tabela pyarrow mapeada em memória; os caminhos dos snapshots estão no dicionário
+SNAPSHOTS do módulo snapshots, com as chaves "deputados", "serie_despesas" e "proposicoes".
+- Não altere os objetos retornados: eles são compartilhados por todas as sessões.
+Defina as funções load_json(filepath, obrigatorias=()) e load_parquet(filepath, obrigatorias=()), que apenas delegam para carregar_json
+e carregar_parquet. Cada seção do dashboard carrega só os seus arquivos, e a falha de um não impede as demais de serem exibidas:
+    - data/insights_despesas_deputados.json, com os campos CAMPOS_INSIGHTS_DESPESAS.
+    - SNAPSHOTS["serie_despesas"], com as colunas COLUNAS_SERIE (deputado_id, dataDocumento, tipoDespesa, valorDocumento, valorLiquido).
+    - SNAPSHOTS["proposicoes"], com as colunas COLUNAS_PROPOSICOES (id, siglaTipo, numero, ano, ementa).
+    - data/sumarizacao_proposicoes.json, com os resumos das proposições.
+Importe de dados_dashboard apenas os nomes usados. Retorne apenas o código Python.
+""",
+)
+
+
+DASHBOARD_ABA_DESPESAS = Template(
+    "dashboard_aba_despesas",
+    "v3",
+    """
+Escreva apenas o código Python para implementar a página "Despesas" em um dashboard Streamlit, continuando um módulo que já define
+load_json, load_parquet e importa de dados_dashboard carregar_snapshot, valores_unicos, fatia_ordenada, CAMPOS_INSIGHTS_DESPESAS e
+COLUNAS_SERIE, e SNAPSHOTS de snapshots:
+- Carregue a série com carregar_snapshot(SNAPSHOTS["serie_despesas"], COLUNAS_SERIE) e o cadastro com carregar_snapshot(SNAPSHOTS["deputados"], ["id", "nome"]).
+- Adicione um st.selectbox com os ids de valores_unicos(serie, "deputado_id", SNAPSHOTS["serie_despesas"]), exibindo "nome (id)" com format_func.
+- A série está ordenada por deputado: obtenha só as linhas do selecionado com
+fatia_ordenada(serie, "deputado_id", deputado_id, SNAPSHOTS["serie_despesas"]). O caminho do snapshot é a chave do cache dessas funções.
+- Antes do gráfico, verifique se as colunas dataDocumento e valorLiquido existem; caso contrário, exiba um erro com st.error.
+- Adicione um st.slider com o período visível e um st.radio "Barras" ou "Linha". Nunca envie todos os pontos ao gráfico:
+use reamostrar(df, inicio, fim, MAX_PONTOS) para as barras e reduzir_linha(df, inicio, fim, MAX_PONTOS) para a linha,
+do módulo downsampling, e exiba com st.caption a quantidade de pontos e a resolução.
+- Leia as janelas móveis do deputado com carregar_despesas_deputado(deputado_id, JANELAS_FILE), de acesso_despesas, tratando FileNotFoundError.
+Mostre com st.metric a soma de cada janela de JANELAS (colunas soma_<dias>d) na última data das linhas com tipoDespesa igual a TODOS,
+e uma tabela com as linhas em que a coluna pico é verdadeira (constantes do módulo janelas_moveis, incluindo LIMIAR_Z).
+- Exiba os insights de data/insights_despesas_deputados.json e as tabelas data/analytics/maiores_gastos.parquet e data/analytics/despesas_tipo.parquet.
+- Use plotly.express para os gráficos e não use st.stop: cada seção verifica se o seu dado não é None.
+Não inclua explicações. Retorne apenas o código Python.
+""",
+)
+
+
+DASHBOARD_ABA_PROPOSICOES = Template(
+    "dashboard_aba_proposicoes",
+    "v2",
+    """
+Escreva apenas o código Python para implementar a seção "Proposições" em um dashboard Streamlit, continuando um módulo que já define
+load_json e importa de dados_dashboard carregar_snapshot, carregar_indice, filtrar_valores e COLUNAS_PROPOSICOES, e SNAPSHOTS de snapshots:
+- Carregue as proposições com carregar_snapshot(SNAPSHOTS["proposicoes"], COLUNAS_PROPOSICOES).
+- Adicione um st.text_input para buscar nas ementas. Só quando houver termo, carregue o índice com carregar_indice("data/proposicoes_deputados.busca.npz")
+e use indice.buscar(termo, k=50), que retorna pares (id, relevancia); junte o resultado com filtrar_valores(proposicoes, "id", ids) e exiba a quantidade encontrada.
+- Sem termo, exiba a tabela completa das proposições.
+- Mostre o resumo das proposições carregado de data/sumarizacao_proposicoes.json.
+Não inclua explicações. Retorne apenas o código Python.
+""",
+)
+
+
+TEMPLATES = {
+    template.id: template
+    for template in [
+        GRAFICO_DISTRIBUICAO,
+        INSIGHTS_DISTRIBUICAO,
+        CODIGO_ANALISE_DESPESAS,
+        INSIGHTS_DESPESAS,
+        DASHBOARD_CHAIN,
+        DASHBOARD_CARREGAR_DADOS,
+        DASHBOARD_ABA_DESPESAS,
+        DASHBOARD_ABA_PROPOSICOES,
+    ]
+}
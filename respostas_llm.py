@@ -0,0 +1,167 @@
+import os
+import ast
+import json
+
+from cache_llm import RespostaCache
+
+MAX_TENTATIVAS = 3
+
+CORRECAO = (
+    "\n\nATENÇÃO: a resposta anterior não era {descricao} válido ({erro}). "
+    "Retorne apenas {descricao}, completo, em um único bloco."
+)
+
+
+class RespostaInvalida(Exception):
+    pass
+
+
+def _validar_python(texto):
+    ast.parse(texto)
+
+
+def _validar_json(texto):
+    json.loads(texto)
+
+
+# formato: (validação, descrição usada no pedido de correção)
+FORMATOS = {
+    "python": (_validar_python, "código Python"),
+    "json": (_validar_json, "JSON"),
+}
+
+
+class ExtratorCerca:
+    # Extrai o conteúdo do primeiro bloco ``` de uma resposta que chega em pedaços.
+    # O texto antes da cerca é descartado; dentro dela, linhas são liberadas assim que chegam,
+    # segurando apenas o começo de linha que ainda pode ser a cerca de fechamento
+    def __init__(self):
+        self.estado = "inicio"
+        self.buffer = ""
+        self.inicio_linha = True
+
+    def alimentar(self, texto):
+        self.buffer += texto
+        saida = []
+
+        if self.estado == "inicio":
+            i = self.buffer.find("```")
+            fim_linha = self.buffer.find("\n", i) if i != -1 else -1
+            if fim_linha == -1:
+                # Cerca ainda não apareceu ou a linha de abertura (```python) não terminou
+                return saida
+            # A linha de abertura, com a linguagem, não faz parte do conteúdo
+            self.buffer = self.buffer[fim_linha + 1:]
+            self.estado = "dentro"
+
+        while self.estado == "dentro" and self.buffer:
+            fim_linha = self.buffer.find("\n")
+
+            if fim_linha == -1:
+                # Linha incompleta: só é liberada se não puder ser a cerca de fechamento
+                if not self.inicio_linha or (self.buffer.strip() and not self.buffer.lstrip().startswith("`")):
+                    saida.append(self.buffer)
+                    self.buffer = ""
+                    self.inicio_linha = False
+                break
+
+            linha = self.buffer[:fim_linha + 1]
+            self.buffer = self.buffer[fim_linha + 1:]
+            if self.inicio_linha and linha.strip().startswith("```"):
+                self.estado = "fim"
+                self.buffer = ""
+                break
+            saida.append(linha)
+            self.inicio_linha = True
+
+        if self.estado == "fim":
+            self.buffer = ""
+
+        return saida
+
+    def finalizar(self):
+        # Sem cerca, a resposta inteira é o conteúdo; cerca não fechada (resposta truncada) libera o resto
+        resto, self.buffer = self.buffer, ""
+        if self.estado == "dentro" and self.inicio_linha and resto.strip().startswith("```"):
+            return []
+        return [resto] if resto else []
+
+
+def _stream(model, prompt, **kwargs):
+    for chunk in model.generate_content(prompt, stream=True, **kwargs):
+        try:
+            texto = chunk.text
+        except ValueError:
+            # Pedaços sem texto (ex.: só metadados de término) são ignorados
+            continue
+        if texto:
+            yield texto
+
+
+def gerar_extraido(model, prompt, formato, destino=None, max_tentativas=MAX_TENTATIVAS, **kwargs):
+    validar, descricao = FORMATOS[formato]
+    tentativa_prompt = prompt
+
+    for tentativa in range(1, max_tentativas + 1):
+        extrator = ExtratorCerca()
+        partes = []
+        tmp = f"{destino}.tmp" if destino else None
+        arquivo = open(tmp, "w", encoding="utf-8") if tmp else None
+
+        try:
+            # O conteúdo vai para o arquivo temporário conforme chega; o destino só é trocado após a validação
+            for trecho in _stream(model, tentativa_prompt, **kwargs):
+                for texto in extrator.alimentar(trecho):
+                    partes.append(texto)
+                    if arquivo:
+                        arquivo.write(texto)
+                        arquivo.flush()
+            for texto in extrator.finalizar():
+                partes.append(texto)
+                if arquivo:
+                    arquivo.write(texto)
+        finally:
+            if arquivo:
+                arquivo.close()
+
+        conteudo = "".join(partes).strip()
+        try:
+            validar(conteudo)
+        except (SyntaxError, ValueError) as e:
+            erro = f"{type(e).__name__}: {e}"
+            print(f"Resposta inválida ({descricao}) na tentativa {tentativa}/{max_tentativas}: {erro}")
+
+            # A resposta inválida não pode ser reaproveitada do cache em execuções futuras
+            invalidar = getattr(model, "invalidar", None)
+            if invalidar is not None:
+                invalidar(tentativa_prompt, kwargs.get("generation_config"))
+            tentativa_prompt = prompt + CORRECAO.format(descricao=descricao, erro=erro)
+            continue
+
+        if destino:
+            with open(tmp, "w", encoding="utf-8") as arquivo:
+                arquivo.write(conteudo + "\n")
+            os.replace(tmp, destino)
+        return conteudo
+
+    if destino and os.path.exists(f"{destino}.tmp"):
+        os.remove(f"{destino}.tmp")
+    raise RespostaInvalida(f"O modelo não retornou {descricao} válido após {max_tentativas} tentativas")
+
+
+class ModeloValidado:
+    # Adapta gerar_extraido à interface generate_content, para uso com o ExecutorLLM
+    def __init__(self, model, formato, max_tentativas=MAX_TENTATIVAS):
+        self.model = model
+        self.formato = formato
+        self.max_tentativas = max_tentativas
+
+    def generate_content(self, prompt, generation_config=None, **kwargs):
+        if generation_config is not None:
+            kwargs["generation_config"] = generation_config
+        return RespostaCache(gerar_extraido(self.model, prompt, self.formato, max_tentativas=self.max_tentativas, **kwargs))
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.model, name)
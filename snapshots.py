@@ -0,0 +1,40 @@
+import os
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Tabelas lidas pelos dashboards; o snapshot Arrow IPC (Feather v2) fica ao lado de cada Parquet
+TABELAS = {
+    "deputados": "data/deputados.parquet",
+    "serie_despesas": "data/serie_despesas_diarias_deputados.parquet",
+    "proposicoes": "data/proposicoes_deputados.parquet",
+}
+
+
+def caminho_snapshot(path):
+    return f"{os.path.splitext(path)[0]}.arrow"
+
+
+SNAPSHOTS = {nome: caminho_snapshot(path) for nome, path in TABELAS.items()}
+
+
+def publicar(path, destino=None):
+    # Sem compressão: o arquivo é mapeado direto na memória, e todas as sessões (e processos)
+    # dos dashboards compartilham a mesma cópia no page cache
+    destino = destino or caminho_snapshot(path)
+    # Um único record batch, para que as colunas mapeadas sejam contíguas (busca binária sem cópia)
+    table = pq.read_table(path).combine_chunks()
+
+    tmp = f"{destino}.tmp"
+    with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+    # A troca é atômica: quem já mapeou o arquivo anterior continua lendo a versão antiga até descartá-la
+    os.replace(tmp, destino)
+    return destino
+
+
+def publicar_snapshots(tabelas=TABELAS):
+    for nome, path in tabelas.items():
+        destino = publicar(path)
+        print(f"Snapshot {nome}: {destino} ({os.path.getsize(destino) / 2**20:.1f} MB)")
@@ -0,0 +1,120 @@
+import os
+import json
+import threading
+
+from executor_llm import ExecutorLLM, estimar_tokens
+
+# Orçamento de tokens de entrada por chamada, bem abaixo da janela de contexto do modelo
+MAX_TOKENS_CHUNK = 6000
+MAX_TOKENS_RESUMO = 500
+
+PROMPT_MAP = "Resuma os seguintes textos de proposições:\n\n"
+PROMPT_REDUCE = (
+    "Os textos abaixo são resumos parciais de proposições legislativas. "
+    "Consolide-os em um único resumo, agrupando temas semelhantes e sem repetir informações:\n\n"
+)
+
+
+def empacotar_por_tokens(textos, max_tokens=MAX_TOKENS_CHUNK):
+    chunks = []
+    atual = []
+    tokens_atual = 0
+
+    for texto in textos:
+        tokens = estimar_tokens(texto)
+
+        # Um texto sozinho maior que o orçamento é truncado para caber em um chunk
+        if tokens > max_tokens:
+            texto = texto[: max_tokens * 4]
+            tokens = max_tokens
+
+        if atual and tokens_atual + tokens > max_tokens:
+            chunks.append(atual)
+            atual = []
+            tokens_atual = 0
+
+        atual.append(texto)
+        tokens_atual += tokens
+
+    if atual:
+        chunks.append(atual)
+
+    return chunks
+
+
+def _montar_prompt(cabecalho, textos):
+    return cabecalho + "\n".join(f"{i + 1}. {texto}" for i, texto in enumerate(textos))
+
+
+class _SaidaIncremental:
+    # Regrava o JSON a cada resumo concluído para que resultados parciais fiquem visíveis
+    def __init__(self, path):
+        self.path = path
+        self.dados = {}
+        self.lock = threading.Lock()
+
+    def gravar(self, chave, valor):
+        with self.lock:
+            self.dados[str(chave)] = valor
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w") as file:
+                json.dump(self.dados, file, ensure_ascii=False, indent=4)
+            os.replace(tmp, self.path)
+
+
+def _ids_por_chunk(chunks, ids):
+    # Os chunks preservam a ordem dos textos, então os ids de cada um são uma fatia contínua
+    fatias, inicio = [], 0
+    for chunk in chunks:
+        fatias.append([id for membros in ids[inicio:inicio + len(chunk)] for id in membros])
+        inicio += len(chunk)
+    return fatias
+
+
+def sumarizar(
+    model, textos, path, max_tokens=MAX_TOKENS_CHUNK, max_tokens_resumo=MAX_TOKENS_RESUMO, executor=None, ids=None
+):
+    # ids, se informado, traz para cada texto a lista de proposições que ele representa (os membros do cluster)
+    executor = executor or ExecutorLLM(model)
+    generation_config = {"max_output_tokens": max_tokens_resumo}
+    saida = _SaidaIncremental(path)
+
+    # Map: cada chunk vira um resumo parcial, gravado com o índice do chunk e, se houver, os ids resumidos
+    chunks = empacotar_por_tokens(textos, max_tokens)
+    if ids is not None:
+        ids_chunks = _ids_por_chunk(chunks, ids)
+        gravar_parcial = lambda idx, response: saida.gravar(idx, {"resumo": response.text, "proposicoes": ids_chunks[idx]})
+    else:
+        gravar_parcial = lambda idx, response: saida.gravar(idx, response.text)
+
+    responses = executor.map(
+        [_montar_prompt(PROMPT_MAP, chunk) for chunk in chunks],
+        generation_config=generation_config,
+        ao_concluir=gravar_parcial,
+    )
+    resumos = [response.text for response in responses]
+
+    # Reduce hierárquico: agrupa os resumos pelo orçamento de tokens até restar apenas um
+    rodada = 0
+    while len(resumos) > 1:
+        rodada += 1
+        grupos = empacotar_por_tokens(resumos, max_tokens)
+
+        # Garante progresso mesmo se cada resumo ocupar o orçamento inteiro
+        if len(grupos) == len(resumos):
+            grupos = [resumos[i:i + 2] for i in range(0, len(resumos), 2)]
+
+        responses = executor.map(
+            [_montar_prompt(PROMPT_REDUCE, grupo) for grupo in grupos],
+            generation_config=generation_config,
+            ao_concluir=lambda idx, response, rodada=rodada: saida.gravar(f"reduce_{rodada}_{idx}", response.text),
+        )
+        resumos = [response.text for response in responses]
+        print(f"Rodada de reduce {rodada}: {len(grupos)} resumos")
+
+    # Sem textos não há resumo, mas o arquivo é gravado assim mesmo, para quem o lê (dashboard, pipeline) encontrá-lo
+    saida.gravar("consolidado", resumos[0] if resumos else None)
+    if ids is not None:
+        saida.gravar("proposicoes", [id for membros in ids for id in membros])
+
+    return saida.dados